@@ -0,0 +1,74 @@
+#!/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""
+Checks that importing pycproject stays cheap: each module is imported
+in a fresh interpreter with python -X importtime, the heavy optional
+dependencies must not be loaded by the import alone.
+
+Run it from the repository root with
+python3 benchmarks/importtime.py
+It exits with status 1 if a module pulls in a heavy dependency.
+"""
+
+import os
+import sys
+import subprocess
+
+
+__author__ = "Christopher Kittel"
+__copyright__ = "Copyright 2015"
+__license__ = "MIT"
+__version__ = "0.1.3"
+__maintainer__ = "Christopher Kittel"
+__email__ = "web@christopherkittel.eu"
+__status__ = "Prototype" # 'Development', 'Production' or 'Prototype'
+
+
+MODULES = ["pycproject.readctree", "pycproject.collection", "pycproject.pipeline",
+           "pycproject.jobs", "pycproject.parallel", "pycproject.factnet"]
+HEAVY = ["pandas", "bs4", "networkx", "matplotlib"]
+
+# prints the heavy modules that were loaded, one per line
+CHECK = """
+import sys
+import {module}
+for name in {heavy!r}:
+    if name in sys.modules:
+        print(name)
+"""
+
+
+def import_time(module):
+    """
+    Imports module in a fresh interpreter.
+    Returns the cumulative import time in microseconds
+    and the list of heavy modules it loaded.
+    """
+    root = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+    env = dict(os.environ, PYTHONPATH=os.pathsep.join(
+        filter(None, [root, os.environ.get("PYTHONPATH")])))
+    proc = subprocess.run([sys.executable, "-X", "importtime", "-c",
+                           CHECK.format(module=module, heavy=HEAVY)],
+                          env=env, stdout=subprocess.PIPE, stderr=subprocess.PIPE,
+                          universal_newlines=True, check=True)
+    cumulative = 0
+    for line in proc.stderr.splitlines():
+        # import time: self [us] | cumulative | imported package
+        fields = line.split("|")
+        if len(fields) == 3 and fields[2].strip() == module:
+            cumulative = int(fields[1])
+    return cumulative, proc.stdout.split()
+
+
+def main():
+    failed = False
+    for module in MODULES:
+        cumulative, loaded = import_time(module)
+        print("%-24s %8.1f ms  %s" %(module, cumulative / 1000,
+                                    "loads " + ", ".join(loaded) if loaded else "ok"))
+        failed = failed or bool(loaded)
+    return 1 if failed else 0
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,131 @@
+#!/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""
+Compares parsing large fulltext.xml and results.xml files
+through a text-mode file object, as CTree did before,
+with parsing them from their path through the shared jats.XMLPARSER.
+
+Every parse runs in a fresh interpreter, which reports its parse time
+and the growth of its peak RSS, so the numbers are not skewed by memory
+kept from earlier runs. Run it from the repository root with
+python3 benchmarks/xmlparse.py --size 200000 --repeat 3
+"""
+
+import os
+import sys
+import json
+import time
+import argparse
+import resource
+import tempfile
+import subprocess
+
+
+__author__ = "Christopher Kittel"
+__copyright__ = "Copyright 2015"
+__license__ = "MIT"
+__version__ = "0.1.3"
+__maintainer__ = "Christopher Kittel"
+__email__ = "web@christopherkittel.eu"
+__status__ = "Prototype" # 'Development', 'Production' or 'Prototype'
+
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+
+def write_fulltext(path, size):
+    """
+    Writes a JATS fulltext.xml with size paragraphs of non-ASCII text.
+    """
+    with open(path, "w", encoding="utf-8") as outfile:
+        outfile.write('<?xml version="1.0" encoding="UTF-8"?>\n<article><front>'
+                      '<journal-meta><journal-title>PLoS One</journal-title></journal-meta>'
+                      '</front><body><sec>')
+        for i in range(size):
+            outfile.write("<p>Paragraph %d on Homo sapiens and Müller's µ-cells, "
+                          "see <xref ref-type='bibr'>%d</xref>.</p>\n" %(i, i))
+        outfile.write("</sec></body></article>\n")
+
+
+def write_results(path, size):
+    """
+    Writes an ami results.xml with size results.
+    """
+    with open(path, "w", encoding="utf-8") as outfile:
+        outfile.write('<?xml version="1.0" encoding="UTF-8"?>\n<results title="binomial">\n')
+        for i in range(size):
+            outfile.write('<result pre="We study %d " exact="Homo sapiens" post=" and Müller" '
+                          'name="binomial" xpath="/article/body/sec/p[%d]"/>\n' %(i, i + 1))
+        outfile.write("</results>\n")
+
+
+def _maxrss():
+    # kilobytes on linux, bytes on macOS
+    rss = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return rss / 1024 if sys.platform == "darwin" else rss
+
+
+def child(method, path):
+    """
+    Parses path once with method, prints its time and peak RSS growth as JSON.
+    """
+    from lxml import etree
+    from pycproject import jats
+    before = _maxrss()
+    start = time.perf_counter()
+    if method == "text":
+        with open(path, "r") as infile:
+            tree = etree.parse(infile)
+    else:
+        tree = etree.parse(path, jats.XMLPARSER)
+    seconds = time.perf_counter() - start
+    elements = sum(1 for _ in tree.getroot().iter())
+    print(json.dumps({"seconds": seconds, "rss_kb": _maxrss() - before,
+                      "elements": elements}))
+
+
+def measure(method, path, repeat):
+    """
+    Returns the best time and the smallest peak RSS growth of repeat runs.
+    """
+    env = dict(os.environ, PYTHONPATH=os.pathsep.join(
+        filter(None, [ROOT, os.environ.get("PYTHONPATH")])))
+    runs = []
+    for _ in range(repeat):
+        output = subprocess.check_output([sys.executable, os.path.abspath(__file__),
+                                          "--child", method, path],
+                                         env=env, universal_newlines=True)
+        runs.append(json.loads(output))
+    return (min(run["seconds"] for run in runs), min(run["rss_kb"] for run in runs),
+            runs[0]["elements"])
+
+
+def main(args):
+    with tempfile.TemporaryDirectory() as tmpdir:
+        files = [("fulltext.xml", write_fulltext), ("results.xml", write_results)]
+        print("%-14s %-6s %10s %8s %14s %10s" %("file", "method", "elements", "MB",
+                                                 "parse time s", "peak RSS MB"))
+        for filename, write in files:
+            path = os.path.join(tmpdir, filename)
+            write(path, args.size)
+            megabytes = os.path.getsize(path) / 2**20
+            for method in ("text", "path"):
+                seconds, rss_kb, elements = measure(method, path, args.repeat)
+                print("%-14s %-6s %10d %8.1f %14.3f %10.1f" %(filename, method, elements,
+                                                              megabytes, seconds,
+                                                              rss_kb / 1024))
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description='compare text-mode and path-based XML parsing')
+    parser.add_argument('--size', dest='size', type=int, default=200000,
+                        help='number of paragraphs and results in the generated files')
+    parser.add_argument('--repeat', dest='repeat', type=int, default=3,
+                        help='number of runs per file and method, the best one is reported')
+    parser.add_argument('--child', dest='child', nargs=2, metavar=('METHOD', 'PATH'),
+                        help=argparse.SUPPRESS)
+    args = parser.parse_args()
+    if args.child:
+        child(*args.child)
+    else:
+        main(args)
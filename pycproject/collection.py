@@ -0,0 +1,216 @@
+#!/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""
+Reads many CProjects as one collection,
+e.g. one CProject per search query, without reading papers
+that appear in several of them more than once.
+"""
+
+import os
+import json
+from collections import OrderedDict
+
+from . import parallel
+from . import storage
+from .readctree import CProject, CTree, ScanReport
+
+
+__author__ = "Christopher Kittel"
+__copyright__ = "Copyright 2015"
+__license__ = "MIT"
+__version__ = "0.1.3"
+__maintainer__ = "Christopher Kittel"
+__email__ = "web@christopherkittel.eu"
+__status__ = "Prototype" # 'Development', 'Production' or 'Prototype'
+
+
+def _pmcid(store):
+    """
+    Returns the PMCID of a CTree from its eupmc_result.json,
+    falls back to the CTree ID.
+    """
+    try:
+        pmcid = json.loads(store.read("eupmc_result.json")).get("pmcid")
+    except (OSError, ValueError):
+        return store.ID
+    if isinstance(pmcid, list):
+        pmcid = pmcid[0] if pmcid else None
+    return pmcid or store.ID
+
+
+def _ctree_results(_, task):
+    """
+    Returns the results of one CTree as list of plain dicts,
+    tagged like CProject.get_results and with the source project,
+    and the ScanReport of reading it.
+    """
+    projectname, projectfolder, store = task
+    ctree = CTree(projectfolder, store.ID, store)
+    return [dict(result, plugin=plugin, type=ptype, ID=ctree.ID, cproject=projectname)
+            for plugin, types in ctree.results.items()
+            for ptype, results in types.items()
+            for result in results], ctree.report
+
+
+def _ctree_apply(func, task):
+    projectname, projectfolder, store = task
+    ctree = CTree(projectfolder, store.ID, store)
+    return (projectname, store.ID, func(ctree)), ctree.report
+
+
+class CProjectCollection(object):
+    """
+    A collection of CProjects, with CTrees deduplicated across projects
+    by their ID or by their PMCID.
+    Each CTree is read from the first project it is found in,
+    CTree objects are shared through one cache.
+    Each CTree counts the files it could not read in its own report,
+    get_results, get_dataframe and map add them to a new self.report per scan.
+
+    >>> collection = CProjectCollection.from_folder("path/to/cprojects")
+    >>> df = collection.get_dataframe(workers=4)
+    >>> df.groupby("cproject").size()
+    """
+
+    def __init__(self, cprojects, dedup="ID", cachesize=1000):
+        """
+        Args: cprojects = list of CProject objects or (projectpath, projectname) tuples
+              dedup = "ID" or "pmcid"
+              cachesize = int, number of CTree objects kept in the cache
+        """
+        if dedup not in ("ID", "pmcid"):
+            raise ValueError("dedup must be 'ID' or 'pmcid', not %r" %dedup)
+        self.cprojects = [cp if isinstance(cp, CProject) else CProject(*cp)
+                          for cp in cprojects]
+        self.dedup = dedup
+        self.cachesize = cachesize
+        self._cache = OrderedDict()
+        self._entries = None
+        self.sources = {}
+        self.report = ScanReport()
+
+    @classmethod
+    def from_folder(cls, projectpath, dedup="ID", cachesize=1000):
+        """
+        Opens every CProject folder or packed CProject in projectpath,
+        other files are ignored.
+        """
+        names = sorted(name for name in os.listdir(projectpath)
+                       if not name.startswith(".") and
+                       (os.path.isdir(os.path.join(projectpath, name)) or
+                        storage.is_archive(os.path.join(projectpath, name))))
+        return cls([CProject(projectpath, name) for name in names], dedup, cachesize)
+
+    def _key(self, store):
+        if self.dedup == "pmcid":
+            return _pmcid(store)
+        return store.ID
+
+    def get_entries(self):
+        """
+        Returns an ordered dict {key: (CProject, store)} of the deduplicated CTrees.
+        self.sources maps each key to the names of all projects containing it.
+        """
+        if self._entries is None:
+            self._entries = OrderedDict()
+            self.sources = {}
+            for cproject in self.cprojects:
+                for store in cproject.get_stores():
+                    key = self._key(store)
+                    self.sources.setdefault(key, []).append(cproject.projectname)
+                    if key not in self._entries:
+                        self._entries[key] = (cproject, store)
+        return self._entries
+
+    def get_ctree(self, key):
+        """
+        Returns a CTree by its ID or PMCID, depending on dedup,
+        from the shared cache if it has been read before.
+        """
+        if key in self._cache:
+            self._cache.move_to_end(key)
+            return self._cache[key]
+        cproject, store = self.get_entries()[key]
+        ctree = CTree(cproject.projectfolder, store.ID, store)
+        self._cache[key] = ctree
+        if len(self._cache) > self.cachesize:
+            self._cache.popitem(last=False)
+        return ctree
+
+    def get_ctrees(self):
+        return iter(self)
+
+    def new_report(self):
+        """
+        Starts a new self.report for a scan and returns it.
+        """
+        self.report = ScanReport()
+        return self.report
+
+    def _tasks(self):
+        return ((cproject.projectname, cproject.projectfolder, store)
+                for cproject, store in self.get_entries().values())
+
+    def get_results(self, workers=1, chunksize=16):
+        """
+        Iterates over the results of all deduplicated CTrees, like CProject.get_results,
+        each result additionally tagged with "cproject", the project it was read from.
+
+        Args: workers = int, number of processes, None for os.cpu_count()
+        """
+        report = self.new_report()
+        if workers == 1:
+            for key, (cproject, store) in self.get_entries().items():
+                ctree = self.get_ctree(key)
+                for plugin, types in ctree.results.items():
+                    for ptype, results in types.items():
+                        for result in results:
+                            yield dict(result, plugin=plugin, type=ptype,
+                                       ID=ctree.ID, cproject=cproject.projectname)
+                report.merge(ctree.report)
+            return
+        for results in parallel.imap(_ctree_results, self._tasks(), workers, chunksize,
+                                     report=report):
+            for result in results:
+                yield result
+
+    def get_dataframe(self, workers=1):
+        """
+        Returns pandas.DataFrame with columns
+        ['ID', 'cproject', 'exact', 'match', 'name', 'plugin', 'post', 'pre', 'type', 'xpath']
+        """
+        import pandas as pd
+        return pd.DataFrame([result for result in self.get_results(workers)
+                             if (result.get("type") != "word" and
+                                 result.get("exact") is not None)])
+
+    def map(self, func, workers=1, chunksize=16):
+        """
+        Applies func to every deduplicated CTree,
+        yields (projectname, ctreeID, func(ctree)).
+        With workers != 1, func must be picklable, e.g. a module-level function.
+        """
+        report = self.new_report()
+        if workers == 1:
+            for key, (cproject, store) in self.get_entries().items():
+                ctree = self.get_ctree(key)
+                yield cproject.projectname, store.ID, func(ctree)
+                report.merge(ctree.report)
+            return
+        yield from parallel.imap(_ctree_apply, self._tasks(), workers, chunksize,
+                                 context=func, report=report)
+
+    def __len__(self):
+        return len(self.get_entries())
+
+    def __iter__(self):
+        """
+        Yields the deduplicated CTree objects of all projects.
+        """
+        for key in self.get_entries():
+            yield self.get_ctree(key)
+
+    def __repr__(self):
+        return '<CProjectCollection: {}>'.format(
+            ", ".join(cp.projectname for cp in self.cprojects))
@@ -5,12 +5,22 @@ from ContentMine-API
 """
 
 import os
+import sys
 import json
 import argparse
-from readctree import CProject
 
-def write_factjson(cproject, outputfolder):
-    for result in cproject.get_results():
+if __package__ in (None, ""):
+    # run as script, python3 pycproject/convert2elasticdump.py
+    sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from pycproject.readctree import CProject
+
+from pycproject.jobs import CheckpointedJob
+
+def fact_docs(ctree):
+    """
+    Yields the facts of a CTree as elasticsearch-dump documents.
+    """
+    for result in ctree.get_results():
         if (result.get("type") != "word" and result.get("exact") is not None):
             source = {}
             source["term"] = result.get("exact")
@@ -21,32 +31,54 @@ def write_factjson(cproject, outputfolder):
             raw = {"_index":"facts",
                     "_type":"snippet",
                     "_source":source}
-            with open(os.path.join(outputfolder, "facts.json"), "a") as outfile:
+            yield raw
+
+def metadata_doc(ctree):
+    """
+    Returns the metadata of a CTree as elasticsearch-dump document.
+    """
+    source = ctree.metadata
+    source["cprojectID"] = ctree.ID
+    raw = {"_index":"metadata",
+            "_type":"eupmc",
+            "_source":source}
+    return raw
+
+def dump_lines(ctree):
+    return {"facts.json": [json.dumps(raw)+"\n" for raw in fact_docs(ctree)],
+            "metadata.json": [json.dumps(metadata_doc(ctree))+"\n"]}
+
+def write_factjson(cproject, outputfolder):
+    for ctree in cproject.get_ctrees():
+        with open(os.path.join(outputfolder, "facts.json"), "a") as outfile:
+            for raw in fact_docs(ctree):
                 outfile.write(json.dumps(raw)+"\n")
 
 def write_metadatajson(cproject, outputfolder):
     for ctree in cproject.get_ctrees():
-        source = ctree.metadata
-        source["cprojectID"] = ctree.ID
-        raw = {"_index":"metadata",
-                "_type":"eupmc",
-                "_source":source}
         with open(os.path.join(outputfolder, "metadata.json"), "a") as outfile:
-            outfile.write(json.dumps(raw)+"\n")
+            outfile.write(json.dumps(metadata_doc(ctree))+"\n")
 
 def main(args):
     """
     If your cproject is in PATH/TO/CPROJECT/CPROJECTNAME, call the script with
     python3 pycproject/convert2elasticdump.py --raw PATH/TO/CPROJECT --name CPROJECTNAME --output PATH/TO/OUTPUTFOLDER
+
+    Progress is checkpointed in the output folder after every chunk of CTrees,
+    calling the script again with the same arguments resumes an interrupted export.
+    Like before, facts.json and metadata.json are appended to if they exist,
+    so several CProjects can be exported into the same output folder.
     """
     cproject = CProject(args.raw, args.name)
-    write_factjson(cproject, args.output)
-    write_metadatajson(cproject, args.output)
+    job = CheckpointedJob(cproject, args.output, "elasticdump_%s" %args.name,
+                          args.chunksize, append=True)
+    job.run(dump_lines)
 
 if __name__ == '__main__':
     parser = argparse.ArgumentParser(description='convert facts and metadata from CProjects to input-json for visualizations')
     parser.add_argument('--raw', dest='raw', help='relative or absolute path of the raw data folder', required=True)
     parser.add_argument('--name', dest='name', help='name of the CProject', required=True)
     parser.add_argument('--output', dest='output', help='relative or absolute path of the output folder', required=True)
+    parser.add_argument('--chunksize', dest='chunksize', type=int, default=1000, help='number of CTrees per checkpoint')
     args = parser.parse_args()
     main(args)
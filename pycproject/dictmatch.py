@@ -0,0 +1,238 @@
+#!/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""
+Matches the terms of an ami-dictionary against the fulltext of CTrees,
+to pre-filter a CProject before running ami itself.
+
+The dictionary is compiled once into an Aho-Corasick automaton,
+so scanning a document costs the same for ten or ten thousand terms.
+"""
+
+from collections import deque
+from lxml import etree
+
+from . import parallel
+from .readctree import ScanReport
+
+
+__author__ = "Christopher Kittel"
+__copyright__ = "Copyright 2015"
+__license__ = "MIT"
+__version__ = "0.1.3"
+__maintainer__ = "Christopher Kittel"
+__email__ = "web@christopherkittel.eu"
+__status__ = "Prototype" # 'Development', 'Production' or 'Prototype'
+
+
+# characters of context stored in "pre" and "post", like ami does
+CONTEXT = 30
+
+
+def _fold(text):
+    """
+    Lower-cases text character by character, keeping characters
+    whose lower case is longer (e.g. "İ"), so offsets in the folded text
+    are offsets in the original text.
+    """
+    return "".join(lower if len(lower) == 1 else char
+                   for char, lower in ((char, char.lower()) for char in text))
+
+
+def read_amidict(filename):
+    """
+    Reads an ami-dictionary as written by convert2amidict.py,
+    returns a list of (term, name) tuples.
+    """
+    root = etree.parse(filename).getroot()
+    return [(entry.get("term"), entry.get("name", entry.get("term")))
+            for entry in root.iter("entry") if entry.get("term")]
+
+
+class DictionaryMatcher(object):
+    """
+    Compiles a list of terms into an Aho-Corasick automaton
+    and finds all whole-word occurrences of them in a text.
+    Matching is case-insensitive, since ami-dictionaries are lower-cased.
+
+    >>> matcher = DictionaryMatcher.from_amidict("species.xml")
+    >>> matcher.match_ctree(cproject.get_ctree("PMC4590491"))
+    [{'pre': 'We study ', 'exact': 'Homo sapiens', 'post': ' and', 'name': 'homo sapiens', 'xpath': '/article/body/sec/p'}]
+    """
+
+    def __init__(self, terms, title=None):
+        """
+        Args: terms = [("term", "name"), ...] or ["term", ...]
+              title = "string"
+        """
+        self.title = title
+        self._goto = [{}]
+        self._fail = [0]
+        self._out = [[]]
+        self._size = 0
+        for term in terms:
+            if isinstance(term, str):
+                term = (term, term)
+            self._add(*term)
+        self._build()
+
+    @classmethod
+    def from_amidict(cls, filename):
+        """
+        Returns a DictionaryMatcher for an ami-dictionary XML file.
+        """
+        title = etree.parse(filename).getroot().get("title")
+        return cls(read_amidict(filename), title)
+
+    def __len__(self):
+        # the outputs of a state include those along its failure links
+        return self._size
+
+    def _add(self, term, name):
+        state = 0
+        term = _fold(term)
+        for char in term:
+            nxt = self._goto[state].get(char)
+            if nxt is None:
+                nxt = len(self._goto)
+                self._goto[state][char] = nxt
+                self._goto.append({})
+                self._fail.append(0)
+                self._out.append([])
+            state = nxt
+        self._out[state].append((len(term), name))
+        self._size += 1
+
+    def _build(self):
+        """
+        Computes the failure links breadth-first
+        and merges the outputs along them.
+        """
+        queue = deque(self._goto[0].values())
+        while queue:
+            state = queue.popleft()
+            for char, nxt in self._goto[state].items():
+                queue.append(nxt)
+                fail = self._fail[state]
+                while fail and char not in self._goto[fail]:
+                    fail = self._fail[fail]
+                self._fail[nxt] = self._goto[fail].get(char, 0)
+                self._out[nxt] = self._out[nxt] + self._out[self._fail[nxt]]
+
+    def find(self, text):
+        """
+        Yields (start, end, name) for every whole-word term found in text.
+        """
+        goto, fail, out = self._goto, self._fail, self._out
+        state = 0
+        for i, char in enumerate(_fold(text)):
+            while state and char not in goto[state]:
+                state = fail[state]
+            state = goto[state].get(char, 0)
+            for length, name in out[state]:
+                start = i - length + 1
+                end = i + 1
+                if ((start == 0 or not text[start-1].isalnum()) and
+                        (end == len(text) or not text[end].isalnum())):
+                    yield start, end, name
+
+    def match_text(self, text, xpath=None):
+        """
+        Returns a list of result dicts for text,
+        in the same shape as CTree.read_resultsxml.
+        """
+        results = []
+        for start, end, name in self.find(text):
+            result = {"pre": text[max(0, start-CONTEXT):start],
+                      "exact": text[start:end],
+                      "post": text[end:end+CONTEXT],
+                      "name": name}
+            if xpath is not None:
+                result["xpath"] = xpath
+            results.append(result)
+        return results
+
+    def match_file(self, source, html=None):
+        """
+        Streams through an XML or HTML file element by element,
+        returns a list of result dicts in the same shape as CTree.read_resultsxml.
+        Matches spanning several elements are not found.
+
+        Args: source = path or file object
+              html = bool, defaults to True for paths ending in .html
+        """
+        results = []
+        if html is None:
+            html = str(source).endswith(".html")
+        # HTML without a meta charset would be read as Latin-1,
+        # XML declares its own encoding
+        context = etree.iterparse(source, events=("start", "end"), html=html,
+                                  encoding="utf-8" if html else None, recover=True)
+        path = []
+        for event, elem in context:
+            if not isinstance(elem.tag, str):
+                continue
+            if event == "start":
+                path.append(elem.tag)
+                continue
+            # text and the tails of children are only complete at the end event
+            xpath = "/" + "/".join(path)
+            if elem.text:
+                results.extend(self.match_text(elem.text, xpath))
+            for child in elem:
+                if child.tail:
+                    results.extend(self.match_text(child.tail, xpath))
+            path.pop()
+            # free the subtree we have already scanned
+            elem.clear(keep_tail=True)
+        return results
+
+    def match_ctree(self, ctree):
+        """
+        Matches the fulltext of a CTree,
+        preferring scholarly.html over fulltext.xml.
+        Returns a list of result dicts, [] if no fulltext is available
+        or it cannot be read, which is recorded in ctree.report.
+        """
+        return self.match_store(ctree.store, ctree.report)
+
+    def match_store(self, store, report=None):
+        """
+        Same as match_ctree, but takes the storage object of a CTree,
+        so the CTree itself does not need to be read.
+
+        Args: report = ScanReport to record unreadable files in
+        """
+        for filename in ("scholarly.html", "fulltext.xml"):
+            if store.exists(filename):
+                try:
+                    return self.match_file(store.source(filename),
+                                           html=filename.endswith(".html"))
+                except (OSError, etree.LxmlError) as e:
+                    # empty, unreadable or broken fulltext, skip the CTree
+                    if report is not None:
+                        report.record_error(e, "/".join((store.path, filename)))
+                    return []
+        return []
+
+    def match_cproject(self, cproject, workers=None, chunksize=16):
+        """
+        Scans all CTrees of a CProject in parallel,
+        yields (ctreeID, [list of result dicts]) for CTrees with at least one match.
+
+        Args: cproject = CProject
+              workers = int, number of processes, defaults to os.cpu_count()
+                        use 1 to scan in the current process
+        Fulltexts that could not be read are counted in a new cproject.report.
+        """
+        report = cproject.new_report()
+        matches = parallel.imap(_match_store, cproject.get_stores(), workers, chunksize,
+                                context=self, report=report, ordered=False)
+        for ctreeID, results in matches:
+            if results:
+                yield ctreeID, results
+
+
+def _match_store(matcher, store):
+    report = ScanReport()
+    return (store.ID, matcher.match_store(store, report)), report
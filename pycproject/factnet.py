@@ -10,12 +10,8 @@ Visualization / network analysis in factnet.py will is no longer supported or ma
 Provides basic network plotting functions for a CProject.
 """
 
-# import network analysis
-import networkx as nx
-from networkx.algorithms import bipartite
-
-# import drawing library
-import matplotlib.pyplot as plt
+# networkx and matplotlib are imported in the functions using them,
+# so importing this module stays cheap
 
 
 __author__ = "Christopher Kittel"
@@ -27,7 +23,12 @@ __email__ = "web@christopherkittel.eu"
 __status__ = "Prototype" # 'Development', 'Production' or 'Prototype'
 
 
-layout=nx.spring_layout
+def __getattr__(name):
+    # module attribute layout=nx.spring_layout, resolved on first access
+    if name == "layout":
+        import networkx as nx
+        return nx.spring_layout
+    raise AttributeError("module %r has no attribute %r" %(__name__, name))
 
 
 def create_network(CProject, plugin, query):
@@ -47,6 +48,8 @@ def create_network(CProject, plugin, query):
         Returns: (bipartite_graph, monopartite_graph, fact_nodes, paper_nodes)
         >>> bipartiteGraph, factGraph, paperGraph, fact_nodes, paper_nodes = create_network(CProject, "species", "binomial")
         """
+        import networkx as nx
+        from networkx.algorithms import bipartite
 
         B = nx.Graph()
         labels = {}
@@ -93,6 +96,9 @@ def plotGraph(graph, color="blue", figsize=(12, 8), layout='neato'):
     circo - circular layout, after Six and Tollis 99, Kauffman and Wiese 02. This is suitable for certain diagrams of multiple cyclic structures, such as certain telecommunications networks.
 
     """
+    import networkx as nx
+    import matplotlib.pyplot as plt
+
     labels = {n:n for n in graph.nodes()}
 
     d = nx.degree_centrality(graph)
@@ -123,6 +129,9 @@ def plotGraph(graph, color="blue", figsize=(12, 8), layout='neato'):
 
 
 def plotBipartiteGraph(graph, color1="r", color2="b", figsize=(12, 8), layout="neato"):
+    import networkx as nx
+    from networkx.algorithms import bipartite
+    import matplotlib.pyplot as plt
 
     labels = {n:n for n in graph.nodes()}
 
@@ -162,6 +171,7 @@ def plotBipartiteGraph(graph, color1="r", color2="b", figsize=(12, 8), layout="n
 
 
 def create_subgraph(cproject, B, G, target):
+    import networkx as nx
 
     sg = nx.Graph()
     sg.add_node(target)
@@ -198,6 +208,8 @@ def create_complete_graph(CProject):
     Args: CProject
     Returns: (bipartite_graph, monopartite_fact_graph, monopartite_paper_graph, paper_nodes, fact_nodes)
     """
+    import networkx as nx
+    from networkx.algorithms import bipartite
 
     partition_mapping = {"papers":0,
                          "binomial":1, "genus":2, "genussp":3,
@@ -248,6 +260,9 @@ def create_complete_graph(CProject):
 
 
 def plotMultipartiteGraph(M, figsize=(60, 40), layout="neato"):
+    import networkx as nx
+    import matplotlib.pyplot as plt
+
     partition_mapping = {"papers":0,
                      "binomial":1, "genus":2, "genussp":3,
                      "carb3":4, "prot3":5, "dna":6, "prot":7,
@@ -304,6 +319,9 @@ def plotMultipartiteGraph(M, figsize=(60, 40), layout="neato"):
 
 
 def plot_all_facts(G, figsize=(60, 40), layout="neato"):
+    import networkx as nx
+    import matplotlib.pyplot as plt
+
     partition_mapping = {"papers":0,
                      "binomial":1, "genus":2, "genussp":3,
                      "carb3":4, "prot3":5, "dna":6, "prot":7,
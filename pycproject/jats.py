@@ -0,0 +1,102 @@
+#!/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""
+Reads fields from a JATS fulltext.xml with precompiled XPaths.
+
+Several fields are extracted in one pass over a document,
+and front-matter fields are read without parsing the body.
+"""
+
+from lxml import etree
+
+
+__author__ = "Christopher Kittel"
+__copyright__ = "Copyright 2015"
+__license__ = "MIT"
+__version__ = "0.1.3"
+__maintainer__ = "Christopher Kittel"
+__email__ = "web@christopherkittel.eu"
+__status__ = "Prototype" # 'Development', 'Production' or 'Prototype'
+
+
+# shared by all XML parsing in pycproject: files are parsed from their path,
+# so libxml2 reads and decodes them itself without an intermediate python string,
+# huge_tree allows very large fulltext.xml and results.xml
+XMLPARSER = etree.XMLParser(huge_tree=True)
+
+KEYWORDS = etree.XPath(".//kwd")
+JOURNAL = etree.XPath(".//journal-title/text()")
+AFFILIATIONS = etree.XPath(".//aff")
+REFERENCES = etree.XPath(".//ref")
+# text of an affiliation or reference without its label, e.g. "1"
+TEXT_WITHOUT_LABEL = etree.XPath(".//text()[not(ancestor::label)]")
+
+# fields that are found in <front>, so the rest can be skipped
+FRONT_FIELDS = {"keywords", "journal", "affiliations"}
+
+
+def _clean(texts):
+    return " ".join(" ".join(texts).split())
+
+
+def _keywords(root):
+    return [kwd.text for kwd in KEYWORDS(root)]
+
+def _journal(root):
+    journals = JOURNAL(root)
+    return journals[0] if journals else None
+
+def _affiliations(root):
+    return [_clean(TEXT_WITHOUT_LABEL(aff)) for aff in AFFILIATIONS(root)]
+
+def _references(root):
+    return [_clean(TEXT_WITHOUT_LABEL(ref)) for ref in REFERENCES(root)]
+
+
+EXTRACTORS = {"keywords": _keywords,
+              "journal": _journal,
+              "affiliations": _affiliations,
+              "references": _references}
+
+
+def parse_front(source):
+    """
+    Parses a fulltext.xml up to the end of <front>,
+    returns the <front> element or None if there is none.
+    """
+    for _, elem in etree.iterparse(source, events=("end",), tag="front",
+                                   huge_tree=True):
+        return elem
+    return None
+
+
+def extract_fields(root, fields):
+    """
+    Extracts several fields from a parsed fulltext.xml at once.
+
+    Args: root = lxml element, e.g. the document root or <front>
+          fields = ["keywords", "journal", "affiliations", "references"]
+    Returns: {"keywords": [...], "journal": "string", ...}
+    """
+    unknown = set(fields) - set(EXTRACTORS)
+    if unknown:
+        raise ValueError("Unknown fields: %s, choose from %s"
+                         %(", ".join(sorted(unknown)), ", ".join(sorted(EXTRACTORS))))
+    return {field: EXTRACTORS[field](root) for field in fields}
+
+
+def read_fields(source, fields):
+    """
+    Reads several fields from a fulltext.xml file in one pass.
+    If only front-matter fields are requested, stops parsing after <front>.
+    Source may be a path or a seekable file object.
+    """
+    if set(fields) <= FRONT_FIELDS:
+        root = parse_front(source)
+        if root is not None:
+            return extract_fields(root, fields)
+        if hasattr(source, "seek"):
+            # the search for <front> has read the file object to its end
+            source.seek(0)
+    return extract_fields(etree.parse(source, XMLPARSER).getroot(), fields)
@@ -0,0 +1,174 @@
+#!/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""
+Runs long jobs over a CProject in ordered chunks of CTrees,
+checkpointing after every chunk, so an interrupted job resumes
+where it stopped and its output files contain every line exactly once.
+"""
+
+import os
+import json
+import shutil
+
+
+__author__ = "Christopher Kittel"
+__copyright__ = "Copyright 2015"
+__license__ = "MIT"
+__version__ = "0.1.3"
+__maintainer__ = "Christopher Kittel"
+__email__ = "web@christopherkittel.eu"
+__status__ = "Prototype" # 'Development', 'Production' or 'Prototype'
+
+
+def _write_atomic(path, lines):
+    """
+    Writes lines to path through a temporary file,
+    so path either holds all lines or the previous content.
+    """
+    tmppath = path + ".tmp"
+    with open(tmppath, "w") as outfile:
+        for line in lines:
+            outfile.write(line)
+        outfile.flush()
+        os.fsync(outfile.fileno())
+    os.replace(tmppath, path)
+
+
+class CheckpointedJob(object):
+    """
+    Processes the CTrees of a CProject in chunks, in the order of their IDs.
+
+    The output of each chunk is written to a part file in a checkpoint folder
+    inside outputfolder, then the chunk is marked as done.
+    A chunk that was interrupted is processed again and its part files replaced,
+    so nothing is written twice. When all chunks are done, the parts are joined
+    into the final output files and the checkpoint folder is removed.
+    Existing output files are replaced, or extended with append=True,
+    e.g. to collect several CProjects in one output folder;
+    give each of them its own name then, so their checkpoints are kept apart.
+
+    >>> def process(ctree):
+    ...     return {"titles.txt": [ctree.get_title() + "\\n"]}
+    >>> CheckpointedJob(MYPROJECT, "path/to/output", name="titles").run(process)
+    """
+
+    def __init__(self, cproject, outputfolder, name="job", chunksize=1000, append=False):
+        self.cproject = cproject
+        self.outputfolder = outputfolder
+        self.name = name
+        self.chunksize = chunksize
+        self.append = append
+        self.workfolder = os.path.join(outputfolder, ".%s.checkpoint" %name)
+        self.checkpointfile = os.path.join(self.workfolder, "checkpoint.json")
+
+    def _load_checkpoint(self):
+        """
+        Returns the saved checkpoint, or starts a new one.
+        The CTree IDs are saved with it, so chunks stay the same on resume
+        even if CTrees were added to the CProject in between.
+        """
+        projectfolder = os.path.abspath(self.cproject.projectfolder)
+        if os.path.exists(self.checkpointfile):
+            with open(self.checkpointfile) as infile:
+                checkpoint = json.load(infile)
+            if checkpoint["projectfolder"] != projectfolder:
+                raise ValueError("Checkpoint in %s was written for %s, not %s"
+                                 %(self.workfolder, checkpoint["projectfolder"], projectfolder))
+            if checkpoint["chunksize"] != self.chunksize:
+                raise ValueError("Checkpoint in %s was written with chunksize %d, not %d"
+                                 %(self.workfolder, checkpoint["chunksize"], self.chunksize))
+            return checkpoint
+        os.makedirs(self.workfolder, exist_ok=True)
+        checkpoint = {"projectfolder": projectfolder,
+                      "ctreeIDs": sorted(self.cproject.get_ctree_ids()),
+                      "chunksize": self.chunksize,
+                      "done": 0,
+                      "outputs": []}
+        self._save_checkpoint(checkpoint)
+        return checkpoint
+
+    def _save_checkpoint(self, checkpoint):
+        _write_atomic(self.checkpointfile, [json.dumps(checkpoint)])
+
+    def _partpath(self, output, chunk):
+        return os.path.join(self.workfolder, "%s.%06d" %(output, chunk))
+
+    def run(self, process):
+        """
+        Runs the job, resuming from the last completed chunk if there is one.
+        Returns the list of paths of the output files.
+        Files that could not be read are counted in a new cproject.report,
+        for the CTrees processed by this run.
+
+        Args: process = function taking a CTree and returning a dict
+                        {outputfilename: [lines]}, lines including their newline
+        """
+        checkpoint = self._load_checkpoint()
+        report = self.cproject.new_report()
+        ctreeIDs = checkpoint["ctreeIDs"]
+        chunks = range(0, len(ctreeIDs), self.chunksize)
+        for chunk, start in enumerate(chunks):
+            if chunk < checkpoint["done"]:
+                continue
+            parts = {}
+            for ctreeID in ctreeIDs[start:start+self.chunksize]:
+                ctree = self.cproject.get_ctree(ctreeID)
+                for output, lines in process(ctree).items():
+                    parts.setdefault(output, []).extend(lines)
+                report.merge(ctree.report)
+            for output, lines in parts.items():
+                _write_atomic(self._partpath(output, chunk), lines)
+            checkpoint["outputs"] = sorted(set(checkpoint["outputs"]) | set(parts))
+            checkpoint["done"] = chunk + 1
+            self._save_checkpoint(checkpoint)
+        return self._finish(checkpoint, len(chunks))
+
+    def _finish(self, checkpoint, nchunks):
+        """
+        Joins the part files of all chunks into the output files.
+        The joined files are written next to the outputs first and marked in
+        the checkpoint, so an interrupted finish only moves them into place
+        and never appends the same parts twice.
+        """
+        outputpaths = [os.path.join(self.outputfolder, output)
+                       for output in checkpoint["outputs"]]
+        if not checkpoint.get("joined"):
+            for output, outputpath in zip(checkpoint["outputs"], outputpaths):
+                with open(outputpath + ".tmp", "w") as outfile:
+                    if self.append and os.path.exists(outputpath):
+                        with open(outputpath) as infile:
+                            shutil.copyfileobj(infile, outfile)
+                    for chunk in range(nchunks):
+                        partpath = self._partpath(output, chunk)
+                        if os.path.exists(partpath):
+                            with open(partpath) as infile:
+                                shutil.copyfileobj(infile, outfile)
+                    outfile.flush()
+                    os.fsync(outfile.fileno())
+            checkpoint["joined"] = True
+            self._save_checkpoint(checkpoint)
+        for outputpath in outputpaths:
+            if os.path.exists(outputpath + ".tmp"):
+                os.replace(outputpath + ".tmp", outputpath)
+        shutil.rmtree(self.workfolder)
+        return outputpaths
+
+
+def _results_lines(ctree):
+    return {"results.json": [json.dumps(dict(result))+"\n" for result in ctree.get_results()
+                             if (result.get("type") != "word" and
+                                 result.get("exact") is not None)]}
+
+
+def get_dataframe(cproject, outputfolder, chunksize=1000):
+    """
+    Builds the same pandas.DataFrame as CProject.get_dataframe,
+    through a resumable job writing results.json to outputfolder.
+    """
+    import pandas as pd
+    job = CheckpointedJob(cproject, outputfolder, "dataframe", chunksize)
+    outputpaths = job.run(_results_lines)
+    if not outputpaths:
+        return pd.DataFrame()
+    return pd.read_json(outputpaths[0], lines=True, dtype=False)
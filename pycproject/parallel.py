@@ -0,0 +1,70 @@
+#!/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""
+Runs a function over many CTrees on a pool of processes,
+handing only a window of tasks to the pool at a time,
+so memory stays bounded for large projects.
+"""
+
+import os
+from itertools import islice
+from multiprocessing import Pool
+
+
+__author__ = "Christopher Kittel"
+__copyright__ = "Copyright 2015"
+__license__ = "MIT"
+__version__ = "0.1.3"
+__maintainer__ = "Christopher Kittel"
+__email__ = "web@christopherkittel.eu"
+__status__ = "Prototype" # 'Development', 'Production' or 'Prototype'
+
+
+# the function and its context are sent once per worker process
+# instead of once per task
+_worker_func = None
+_worker_context = None
+
+def _init_worker(func, context):
+    global _worker_func, _worker_context
+    _worker_func, _worker_context = func, context
+
+def _run_in_worker(task):
+    return _worker_func(_worker_context, task)
+
+
+def imap(func, tasks, workers=None, chunksize=16, context=None, report=None, ordered=True):
+    """
+    Yields func(context, task) for every task.
+
+    Args: func = module-level function taking (context, task)
+          tasks = iterable, read a window at a time
+          workers = int, number of processes, defaults to os.cpu_count()
+                    use 1 to run in the current process
+          context = picklable object passed to every call, e.g. a compiled automaton
+          report = ScanReport, if given func returns (result, ScanReport),
+                   the reports are merged into it and only the results are yielded
+          ordered = bool, False yields results as they are done
+    """
+    if workers == 1:
+        results = (func(context, task) for task in tasks)
+    else:
+        results = _imap_pool(func, tasks, workers, chunksize, context, ordered)
+    for result in results:
+        if report is not None:
+            result, task_report = result
+            report.merge(task_report)
+        yield result
+
+
+def _imap_pool(func, tasks, workers, chunksize, context, ordered):
+    tasks = iter(tasks)
+    window = (workers or os.cpu_count() or 1) * chunksize * 4
+    with Pool(workers, initializer=_init_worker, initargs=(func, context)) as pool:
+        pool_imap = pool.imap if ordered else pool.imap_unordered
+        while True:
+            batch = list(islice(tasks, window))
+            if not batch:
+                break
+            yield from pool_imap(_run_in_worker, batch, chunksize)
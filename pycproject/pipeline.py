@@ -0,0 +1,233 @@
+#!/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""
+Composable, lazy pipelines over the CTrees of a CProject.
+
+A pipeline starts from a source (CTrees or ami-results), adds stages
+(filter, map, flat_map, batch) and ends in a sink (list, Counter, DataFrame,
+NDJSON, parquet). Nothing is read before the sink runs. All stages up to the
+first batch are fused into one function applied per CTree, serially or on a
+process pool, and since CTree fields are read on first access,
+only the files the stages touch are parsed.
+
+>>> from pycproject.pipeline import Pipeline
+>>> (Pipeline.results(MYPROJECT)
+...     .filter(is_species)
+...     .map(get_exact)
+...     .parallel(workers=4)
+...     .to_counter())
+"""
+
+import json
+from collections import Counter
+from itertools import islice
+
+from . import parallel
+from .readctree import CTree
+
+
+__author__ = "Christopher Kittel"
+__copyright__ = "Copyright 2015"
+__license__ = "MIT"
+__version__ = "0.1.3"
+__maintainer__ = "Christopher Kittel"
+__email__ = "web@christopherkittel.eu"
+__status__ = "Prototype" # 'Development', 'Production' or 'Prototype'
+
+
+def ctree_results(ctree):
+    """
+    Returns the results of a CTree as plain dicts, tagged like CProject.get_results.
+    """
+    return [dict(result) for result in ctree.get_results()]
+
+
+def _apply(stages, item):
+    """
+    Runs the element-wise stages on one item, returns the list of outputs.
+    """
+    items = [item]
+    for kind, func in stages:
+        if kind == "filter":
+            items = [x for x in items if func(x)]
+        elif kind == "map":
+            items = [func(x) for x in items]
+        elif kind == "flat_map":
+            items = [y for x in items for y in func(x)]
+        if not items:
+            break
+    return items
+
+
+def _run_ctree(stages, task):
+    projectfolder, store = task
+    ctree = CTree(projectfolder, store.ID, store)
+    return _apply(stages, ctree), ctree.report
+
+
+class Pipeline(object):
+    """
+    A lazy pipeline over the CTrees of a CProject.
+    Every stage returns a new Pipeline, the CProject is only read by a sink.
+    With workers != 1, all functions must be picklable, e.g. module-level functions.
+    Files that could not be read are counted in a new report of the CProject
+    each time a sink runs, see CProject.report.
+    """
+
+    def __init__(self, cproject, stages=(), workers=1, chunksize=16):
+        self.cproject = cproject
+        self.stages = tuple(stages)
+        self.workers = workers
+        self.chunksize = chunksize
+
+    @classmethod
+    def ctrees(cls, cproject):
+        """
+        Source yielding the CTree objects of a CProject.
+        """
+        return cls(cproject)
+
+    @classmethod
+    def results(cls, cproject):
+        """
+        Source yielding the results of all CTrees, like CProject.get_results.
+        """
+        return cls(cproject).flat_map(ctree_results)
+
+    def _add(self, kind, func):
+        return Pipeline(self.cproject, self.stages + ((kind, func),),
+                        self.workers, self.chunksize)
+
+    def filter(self, func):
+        return self._add("filter", func)
+
+    def map(self, func):
+        return self._add("map", func)
+
+    def flat_map(self, func):
+        return self._add("flat_map", func)
+
+    def batch(self, size):
+        """
+        Groups items into lists of size items, the last one may be shorter.
+        """
+        return self._add("batch", size)
+
+    def parallel(self, workers=None, chunksize=16):
+        """
+        Runs the stages up to the first batch on a pool of workers processes,
+        workers=None uses os.cpu_count().
+        """
+        return Pipeline(self.cproject, self.stages, workers, chunksize)
+
+    def _split(self):
+        """
+        Returns the stages that run per CTree, and the rest.
+        """
+        for i, (kind, _) in enumerate(self.stages):
+            if kind == "batch":
+                return self.stages[:i], self.stages[i:]
+        return self.stages, ()
+
+    def _tasks(self):
+        return ((self.cproject.projectfolder, store) for store in self.cproject.get_stores())
+
+    def _per_ctree(self, fused):
+        report = self.cproject.new_report()
+        for items in parallel.imap(_run_ctree, self._tasks(), self.workers, self.chunksize,
+                                   context=fused, report=report):
+            yield from items
+
+    def __iter__(self):
+        """
+        Runs the pipeline, yielding its output items.
+        """
+        fused, rest = self._split()
+        items = self._per_ctree(fused)
+        for kind, func in rest:
+            if kind == "batch":
+                items = _batched(items, func)
+            else:
+                items = _chain(items, kind, func)
+        return iter(items)
+
+    # sinks
+
+    def to_list(self):
+        return list(self)
+
+    def to_counter(self):
+        """
+        Counts the items, e.g. after .map(lambda result: result["exact"]).
+        Batches of items are counted item by item.
+        """
+        counter = Counter()
+        for item in self:
+            if isinstance(item, _Batch):
+                counter.update(item)
+            else:
+                counter[item] += 1
+        return counter
+
+    def to_dataframe(self):
+        """
+        Returns a pandas.DataFrame with one row per item, items must be dicts.
+        """
+        import pandas as pd
+        return pd.DataFrame(list(_flatten(self)))
+
+    def to_ndjson(self, outputfile):
+        """
+        Writes the items as JSON lines, returns the number of lines written.
+        """
+        n = 0
+        with open(outputfile, "w") as outfile:
+            for item in _flatten(self):
+                outfile.write(json.dumps(item)+"\n")
+                n += 1
+        return n
+
+    def to_parquet(self, outputfile, batchsize=1000):
+        """
+        Writes the items, which must be dicts, to a parquet file. Needs pyarrow.
+        """
+        from .textextract import write_parquet
+        write_parquet(_flatten(self), outputfile, batchsize)
+
+    def __repr__(self):
+        stages = " -> ".join(kind for kind, _ in self.stages)
+        return '<Pipeline: {}{}>'.format(self.cproject.projectname,
+                                         " -> " + stages if stages else "")
+
+
+def _chain(items, kind, func):
+    for item in items:
+        yield from _apply(((kind, func),), item)
+
+
+class _Batch(list):
+    """
+    A list made by a batch stage, so sinks can tell batches
+    from items that are lists themselves.
+    """
+
+
+def _batched(items, size):
+    items = iter(items)
+    while True:
+        batch = _Batch(islice(items, size))
+        if not batch:
+            return
+        yield batch
+
+
+def _flatten(items):
+    """
+    Unpacks batches, so sinks write single items.
+    """
+    for item in items:
+        if isinstance(item, _Batch):
+            yield from item
+        else:
+            yield item
@@ -13,10 +13,13 @@ import glob
 from lxml import etree
 import json
 from collections import Counter
-import pandas as pd
+from functools import cached_property
 
-# import data handling
-from bs4 import BeautifulSoup
+# pandas, BeautifulSoup and the batch modules are imported where they are needed,
+# since they take most of the import time of this module
+from . import jats
+from . import storage
+from .jats import XMLPARSER
 
 
 __author__ = "Christopher Kittel"
@@ -28,15 +31,119 @@ __email__ = "web@christopherkittel.eu"
 __status__ = "Prototype" # 'Development', 'Production' or 'Prototype'
 
 
+class ScanReport(object):
+    """
+    Counts files that were skipped while reading CTrees, by category,
+    and keeps some sample paths per category, e.g.
+    {'no entities': {'count': 812, 'samples': ['path/to/PMC123/entities', ...]},
+     'xml error': {'count': 3, 'samples': ['path/to/PMC456/results/gene/human/results.xml', ...]}}
+    """
+
+    def __init__(self, samplesize=10):
+        self.samplesize = samplesize
+        self.counts = Counter()
+        self.samples = {}
+
+    def record(self, category, path):
+        self.counts[category] += 1
+        samples = self.samples.setdefault(category, [])
+        if len(samples) < self.samplesize:
+            samples.append(path)
+
+    def record_error(self, error, path):
+        """
+        Records an exception raised while reading path under its category.
+        """
+        self.record(_error_category(error), path)
+
+    def merge(self, other):
+        """
+        Adds the counts and samples of another ScanReport, e.g. from a worker process.
+        """
+        for category, count in other.counts.items():
+            self.counts[category] += count
+            samples = self.samples.setdefault(category, [])
+            samples.extend(other.samples.get(category, [])[:self.samplesize-len(samples)])
+
+    def to_dict(self):
+        return {category: {"count": count, "samples": list(self.samples.get(category, []))}
+                for category, count in self.counts.most_common()}
+
+    def __len__(self):
+        return sum(self.counts.values())
+
+    def __repr__(self):
+        return '<ScanReport: {}>'.format(
+            ", ".join("%s: %d" %item for item in self.counts.most_common()) or "no problems")
+
+
+def _error_category(error):
+    if isinstance(error, PermissionError):
+        return "permission denied"
+    if isinstance(error, FileNotFoundError):
+        return "missing file"
+    if isinstance(error, etree.LxmlError):
+        return "xml error"
+    if isinstance(error, ValueError):
+        # includes json.JSONDecodeError and UnicodeDecodeError
+        return "decode error"
+    return "io error"
+
+
+def _parse_dates(values):
+    """
+    Parses a list of "YYYY-MM-DD" strings into a datetime64[D] array at once,
+    falls back to parsing one by one if any of them is malformed, which become NaT.
+    """
+    import numpy as np
+    try:
+        return np.array(values, dtype="datetime64[D]")
+    except ValueError:
+        dates = np.empty(len(values), dtype="datetime64[D]")
+        for i, value in enumerate(values):
+            try:
+                dates[i] = np.datetime64(value, "D")
+            except ValueError:
+                dates[i] = np.datetime64("NaT")
+        return dates
+
+
+def _to_periods(dates, freq, already=False):
+    """
+    Bins datetime64 dates into periods of freq "Y", "M" or "W",
+    weeks start on monday. With already=True, dates are periods
+    and are only converted to datetime64[D] for use as index.
+    """
+    import numpy as np
+    if freq == "W":
+        # numpy weeks start on thursday, the weekday of 1970-01-01
+        if already:
+            return dates.astype("datetime64[D]") - np.timedelta64(3, "D")
+        return (dates + np.timedelta64(3, "D")).astype("datetime64[W]")
+    if already:
+        return dates.astype("datetime64[D]")
+    return dates.astype("datetime64[%s]" %freq)
+
 
 class CProject(object):
     """
     Maps the CProject file structure to a data object.
-    Initialize with the project path (absolute) and foldername.
+    Initialize with the project path (absolute) and foldername,
+    or with the path and filename of a packed CProject, see storage.pack.
+    Every CTree counts the files it could not read in its own report.
+    Each scan over the CProject (get_results, get_pub_dates, extract_text,
+    pipelines, jobs, ...) starts a new self.report and adds the reports
+    of all CTrees it reads to it, so self.report belongs to the last scan.
     """
     def __init__(self, projectpath, projectname):
         self.projectname = projectname
         self.projectfolder = os.path.join(projectpath, projectname)
+        if storage.is_archive(self.projectfolder):
+            self.archive = storage.CProjectArchive(self.projectfolder)
+        else:
+            self.archive = None
+        self.report = ScanReport()
+        self._pub_dates = {}
         self.size = self.get_size()
 
     def get_ctrees(self):
@@ -49,7 +156,49 @@ class CProject(object):
         """
         Return a CTree object by its ID.
         """
-        return CTree(self.projectfolder, ctreeID)
+        return CTree(self.projectfolder, ctreeID, self.get_store(ctreeID))
+
+    def new_report(self):
+        """
+        Starts a new self.report for a scan and returns it.
+        """
+        self.report = ScanReport()
+        return self.report
+
+    def _scan(self):
+        """
+        Yields all CTrees, adding the report of each one to a new self.report
+        once the caller is done with it.
+        """
+        report = self.new_report()
+        for ctree in iter(self):
+            yield ctree
+            report.merge(ctree.report)
+
+    def get_ctree_ids(self):
+        """
+        Returns a list of the IDs of all CTrees.
+        """
+        if self.archive is not None:
+            return self.archive.get_ctree_ids()
+        return [dir_entry for dir_entry in os.listdir(self.projectfolder)
+                if os.path.isdir(os.path.join(self.projectfolder, dir_entry))]
+
+    def get_store(self, ctreeID):
+        """
+        Returns the storage object giving access to the files of a CTree,
+        from its folder or from the packed archive.
+        """
+        if self.archive is not None:
+            return self.archive.get_store(ctreeID)
+        return storage.DirectoryStore(os.path.join(self.projectfolder, ctreeID))
+
+    def get_stores(self):
+        """
+        Returns a generator of the storage objects of all CTrees,
+        for reading their files without constructing CTree objects.
+        """
+        return (self.get_store(ctreeID) for ctreeID in self.get_ctree_ids())
 
     def get_title(self, ctreeID):
         """
@@ -62,26 +211,127 @@ class CProject(object):
         Iterates over all results, yields content of results.xml as dict,
         plus name of ami-plugin and the plugin-type.
         """
-        for ctree in iter(self):
-            for plugin, types in ctree.results.items():
-                for ptype, results in types.items():
-                    for result in results:
-                        result["plugin"] = plugin
-                        result["type"] = ptype
-                        result["ID"] = ctree.ID
-                        yield result
+        for ctree in self._scan():
+            for result in ctree.get_results():
+                yield result
 
     def get_dataframe(self):
         """
         Returns pandas.DataFrame with columns
         ['ID', 'exact', 'match', 'name', 'plugin', 'post', 'pre', 'type', 'xpath']
         """
+        import pandas as pd
         df = pd.DataFrame()
         for result in self.get_results():
             if (result.get("type") != "word" and result.get("exact") is not None):
                 df = df.append(pd.DataFrame.from_dict(result, "index").T)
         return df
 
+    def get_pub_dates(self, field="firstPublicationDate"):
+        """
+        Returns (ctreeIDs, dates) as numpy arrays, dates as datetime64[D],
+        NaT where a CTree has no such date.
+        Only the date field is read from each eupmc_result.json,
+        the arrays are cached per field.
+
+        Parameters
+        ----------
+        field : str
+            Date field of eupmc_result.json, e.g. "firstPublicationDate"
+            or "electronicPublicationDate"
+        """
+        import numpy as np
+        if field not in self._pub_dates:
+            report = self.new_report()
+            pattern = re.compile(r'"%s"\s*:\s*\[?\s*"([^"]*)"' %re.escape(field))
+            ctreeIDs, values = [], []
+            for store in self.get_stores():
+                ctreeIDs.append(store.ID)
+                if not store.exists("eupmc_result.json"):
+                    report.record("no metadata", os.path.join(store.path, "eupmc_result.json"))
+                    values.append("NaT")
+                    continue
+                try:
+                    match = pattern.search(store.read("eupmc_result.json").decode("utf-8"))
+                except (OSError, ValueError) as error:
+                    report.record_error(error, os.path.join(store.path, "eupmc_result.json"))
+                    match = None
+                values.append(match.group(1)[:10] if match else "NaT")
+            self._pub_dates[field] = (np.array(ctreeIDs), _parse_dates(values))
+        return self._pub_dates[field]
+
+    def _get_groups(self, by):
+        """
+        Returns {ctreeID: [group names]} of the plugins or plugin/query results
+        found for each CTree, read from the results folders only.
+        A plugin/query only counts if it has a results.xml,
+        files lying in the results folders are skipped.
+        """
+        groups = {}
+        for store in self.get_stores():
+            queries = []
+            try:
+                plugins = store.listdir("results")
+            except OSError:
+                plugins = []
+            for plugin in plugins:
+                try:
+                    names = store.listdir("results/" + plugin)
+                except OSError:
+                    # not a folder
+                    continue
+                queries.extend(plugin + "/" + query for query in names
+                               if store.exists("results/%s/%s/results.xml" %(plugin, query)))
+            if by == "plugin":
+                groups[store.ID] = sorted(set(query.split("/")[0] for query in queries))
+            else:
+                groups[store.ID] = queries
+        return groups
+
+    def get_pub_histogram(self, freq="Y", field="firstPublicationDate", by=None):
+        """Returns number of publications per year, month or week,
+        as pandas.Series, or as pandas.DataFrame with one column per group if by is set.
+        Periods without publications are included with 0.
+
+        Parameters
+        ----------
+        freq : str
+            "Y" for years, "M" for months, "W" for weeks starting on monday
+        field : str
+            Date field of eupmc_result.json, see get_pub_dates
+        by : str
+            None, "plugin" or "query" to count publications with a results.xml
+            of each ami-plugin or plugin/query, e.g. "species/binomial"
+        """
+        import numpy as np
+        import pandas as pd
+        if freq not in ("Y", "M", "W"):
+            raise ValueError("freq must be 'Y', 'M' or 'W', not %r" %freq)
+        if by not in (None, "plugin", "query"):
+            raise ValueError("by must be None, 'plugin' or 'query', not %r" %by)
+        ctreeIDs, dates = self.get_pub_dates(field)
+        known = ~np.isnat(dates)
+        ctreeIDs, dates = ctreeIDs[known], dates[known]
+        periods = _to_periods(dates, freq)
+        if len(periods) == 0:
+            return pd.Series(dtype="int64") if by is None else pd.DataFrame()
+        first, last = periods.min(), periods.max()
+        codes = (periods - first).astype("int64")
+        index = _to_periods(np.arange(first, last + 1), freq, already=True)
+        if by is None:
+            counts = np.bincount(codes, minlength=len(index))
+            return pd.Series(counts, index=index)
+        groups = self._get_groups(by)
+        names = sorted(set(name for ctree_groups in groups.values() for name in ctree_groups))
+        name_codes = {name: i for i, name in enumerate(names)}
+        sizes = np.array([len(groups.get(ctreeID, [])) for ctreeID in ctreeIDs], dtype="int64")
+        rows = np.repeat(codes, sizes)
+        cols = np.array([name_codes[name] for ctreeID in ctreeIDs
+                         for name in groups.get(ctreeID, [])], dtype="int64")
+        counts = np.zeros((len(index), len(names)), dtype="int64")
+        np.add.at(counts, (rows, cols), 1)
+        return pd.DataFrame(counts, index=index, columns=names)
+
     def get_pub_years(self, min_year=3000, max_year=0):
         """Returns pandas.Series of years and number of publications.
 
@@ -92,34 +342,23 @@ class CProject(object):
         max_year : int
             Set upper threshold
         """
-        years_counter = (int(ct.first_publication_date[0][0:4]) for ct in self.get_ctrees())
-        years = Counter()
-        for year in years_counter:
-            if year < min_year:
-                min_year = year
-            if year > max_year:
-                max_year = year
-            if year in years:
-                years[year] += 1
-            else:
-                years[year] = 1
-
-        final_years = Counter()
-        for i in range(max_year - min_year + 1):
-            if min_year + i in years:
-                final_years[min_year + i] = years[min_year + i]
-            else:
-                final_years[min_year + i] = 0
-
-        series = pd.Series(final_years)
-        series.sort_index(inplace=True)
-
-        return series
+        import numpy as np
+        import pandas as pd
+        _, dates = self.get_pub_dates()
+        dates = dates[~np.isnat(dates)]
+        years = dates.astype("datetime64[Y]").astype("int64") + 1970
+        if len(years):
+            min_year = min(min_year, years.min())
+            max_year = max(max_year, years.max())
+        if max_year < min_year:
+            return pd.Series(dtype="int64")
+        counts = np.bincount(years - min_year, minlength=max_year - min_year + 1)
+        return pd.Series(counts, index=np.arange(min_year, max_year + 1))
 
     def get_authors(self):
         """Returns collections.Counter of authors and publication counts."""
         authors = Counter()
-        for ctree in self.get_ctrees():
+        for ctree in self._scan():
             if 'authorList' in ctree.metadata:
                 #print(ctree.metadata['authorList'][0]['author'])
                 ctree_authors = ctree.metadata['authorList'][0]['author']
@@ -131,7 +370,7 @@ class CProject(object):
     def get_journals(self):
         """Returns collections.Counter of journals and article counts."""
         journals = Counter()
-        for ctree in self.get_ctrees():
+        for ctree in self._scan():
             if 'journalInfo' in ctree.metadata:
                 #print(ctree.metadata['authorList'][0]['author'])
                 ctree_journals = ctree.metadata['journalInfo'][0]['journal']
@@ -143,18 +382,47 @@ class CProject(object):
     def get_word_frequencies(self):
         """Returns collections.Counter of words and frequency counts."""
         words = Counter()
-        for ctree in self.get_ctrees():
+        for ctree in self._scan():
             if 'word' in ctree.results:
                 for word in ctree.results['word']['frequencies']:
                     words.update({word['word'], int(word['count'])})
         return words
 
+    def extract_text(self, fields, workers=None, output=None):
+        """
+        Extracts text sections of all CTrees, parsing each scholarly.html once.
+        Returns a generator of dicts {"ID": ctreeID, field: "text"},
+        or writes them to output (.jsonl or .parquet) if given.
+        Unreadable scholarly.html give empty fields and are counted in a new self.report.
+
+        Parameters
+        ----------
+        fields : list of str
+            "abstract", "acknowledgements", "competing_interests",
+            any other string is used as a section title, see CTree.get_section
+        workers : int
+            Number of processes, defaults to number of CPUs
+        output : str
+            Path of an output file
+        """
+        from . import textextract
+        return textextract.extract_text(self.get_stores(), fields, workers, output,
+                                        self.new_report())
+
+    def get_index(self, dbpath=None):
+        """
+        Returns a search.CProjectIndex for full-text search over the CTrees.
+        Call build() on it to add new or changed CTrees.
+        """
+        from . import search
+        return search.CProjectIndex(self, dbpath)
+
     def __len__(self):
         """
         Returns size of dataset = number of ctrees.
         """
-        # must loop through since get_ctrees() is a generator
-        return sum(1 for x in self.get_ctrees())
+        # count the folders, without reading every CTree
+        return len(self.get_ctree_ids())
 
     def __iter__(self):
         """
@@ -162,10 +430,8 @@ class CProject(object):
 
         Yields: CTree
         """
-        for dir_entry in os.listdir(self.projectfolder):
-            if os.path.isdir(os.path.join(self.projectfolder, dir_entry)):
-                ctree = CTree(self.projectfolder, dir_entry)
-                yield ctree
+        for ctreeID in self.get_ctree_ids():
+            yield self.get_ctree(ctreeID)
 
     def __repr__(self):
         return '<CProject: {}>'.format(self.projectname)
@@ -186,39 +452,88 @@ class CTree(object):
                            'species':set([binomial, genus, genussp])}
     self.results = {'species':{'binomial':[list_of_dicts]}}
     self.entities = {"PERSON": [], "LOCATION": [], "ORGANIZATION": []}
+    self.report = ScanReport of the files of this CTree that could not be read
+
+    The files behind manifest, available_plugins, plugin_queries, results,
+    entities and metadata are read on first access, so creating a CTree is cheap
+    and fields that are never used are never parsed.
     """
 
-    def __init__(self, projectfolder, ctreeID):
+    def __init__(self, projectfolder, ctreeID, store=None, report=None):
         self.path = os.path.join(projectfolder, ctreeID)
         self.ID = ctreeID
+        self.store = store or storage.DirectoryStore(self.path)
+        self.report = report if report is not None else ScanReport()
         self.shtmlpath = self._get_shtmlpath()
         self.fulltextxmlpath = self._get_fxmlpath()
         self.resultspath = os.path.join(self.path, "results")
-        self.available_plugins = self._get_plugins()
-        self.plugin_queries = self._get_queries()
-        self.results = self._get_results()
-        self.entities = self._load_entities()
-        self.metadata = self._get_metadata()
-        self.first_publication_date = self.metadata.get("firstPublicationDate")
+        self._fulltext_xml = None
+        self._front = None
 
-    def _get_metadata(self):
+    @cached_property
+    def manifest(self):
+        return self.store.manifest(
+            onerror=lambda error: self.report.record_error(error, error.filename))
+
+    @cached_property
+    def available_plugins(self):
+        return self._get_plugins()
+
+    @cached_property
+    def plugin_queries(self):
+        return self._get_queries()
+
+    @cached_property
+    def results(self):
+        return self._get_results()
+
+    @cached_property
+    def entities(self):
+        return self._load_entities()
+
+    @cached_property
+    def metadata(self):
+        return self._get_metadata()
+
+    @property
+    def first_publication_date(self):
+        return self.metadata.get("firstPublicationDate")
+
+    def _read_json(self, relpath, missing):
         """
+        Reads a json file of the CTree, returns {} if it is missing or unreadable.
+        Missing files are recorded in the report as category missing.
+        """
+        if relpath not in self.manifest:
+            self.report.record(missing, os.path.join(self.path, relpath))
+            return {}
+        try:
+            return json.loads(self.store.read(relpath))
+        except (OSError, ValueError) as error:
+            self.report.record_error(error, os.path.join(self.path, relpath))
+            return {}
 
+    def _get_metadata(self):
         """
-        resultsjsonfile = os.path.join(self.path, "eupmc_result.json")
-        with open(resultsjsonfile) as infile:
-            return json.load(infile)
+        Loads eupmc_result.json, returns {} if none found.
+        """
+        return self._read_json("eupmc_result.json", "no metadata")
 
     def _load_entities(self):
         """
         Tries to load entities, returns {} if none found.
         """
-        try:
-            with open(os.path.join(os.getcwd(), self.path, "entities"), "r") as dumpfile:
-                return json.load(dumpfile)
-        except:
-            # needs logging for missing entity results
-            return {}
+        return self._read_json("entities", "no entities")
+
+    def _listdir(self, relpath):
+        """
+        Returns the subfolders of a folder of the CTree, from the manifest.
+        """
+        prefix = relpath + "/"
+        return sorted(set(entry[len(prefix):].split("/")[0]
+                          for entry in self.manifest
+                          if entry.startswith(prefix) and entry.count("/") == prefix.count("/") + 1
+                          and entry.endswith("/")))
 
     def _get_shtmlpath(self):
         return os.path.join(self.path, "scholarly.html")
@@ -231,11 +546,10 @@ class CTree(object):
         Returns a list of available ami-plugin-results.
         ['sequence', 'regex', 'gene']
         """
-        try:
-            return os.listdir(self.resultspath)
-        except:
-            # needs logging of missing plugin-results
+        if "results/" not in self.manifest:
+            self.report.record("no results", self.resultspath)
             return []
+        return self._listdir("results")
 
     def _get_queries(self):
         """
@@ -247,7 +561,7 @@ class CTree(object):
         'sequence': set(['carb3', 'prot3', 'dna', 'prot']),
         'species': set(['binomial', 'genus', 'genussp'])}
         """
-        return {plugin:set(os.listdir(os.path.join(self.resultspath, plugin)))
+        return {plugin:set(self._listdir("results/" + plugin))
             for plugin in self.available_plugins}
 
 
@@ -268,16 +582,38 @@ class CTree(object):
         """
         Reads a results xml,
         returns a list of dicts containing attribs and values.
-        """
+        Missing or unreadable files are recorded in the report and return [].
+        Files outside of this CTree are read from their path.
+        """
+        relpath = os.path.relpath(filename, self.path).replace(os.sep, "/")
+        if relpath == ".." or relpath.startswith("../"):
+            source = filename
+        elif relpath not in self.manifest:
+            self.report.record("no results.xml", filename)
+            return []
+        else:
+            source = self.store.source(relpath)
         try:
-            with open(filename, 'r') as infile:
-                tree = etree.parse(infile)
-            root = tree.getroot()
-            results = root.findall('result')
-            return [res.attrib for res in results]
-        except:
-            # needs logging of missing results.xml
+            tree = etree.parse(source, XMLPARSER)
+        except (OSError, etree.XMLSyntaxError) as error:
+            self.report.record_error(error, filename)
             return []
+        root = tree.getroot()
+        results = root.findall('result')
+        return [res.attrib for res in results]
+
+    def get_results(self):
+        """
+        Iterates over all results of this CTree, yields content of results.xml as dict,
+        plus name of ami-plugin, the plugin-type and the CTree ID.
+        """
+        for plugin, types in self.results.items():
+            for ptype, results in types.items():
+                for result in results:
+                    result["plugin"] = plugin
+                    result["type"] = ptype
+                    result["ID"] = self.ID
+                    yield result
 
     def show_results(self, plugin):
         """
@@ -301,13 +637,47 @@ class CTree(object):
     def get_shtml(self):
         """
         Returns the scholarly.html as a BeautifulSoup object.
+        The file is read as bytes, so its encoding is detected once by the parser.
         """
-        with open(self.shtmlpath, "r") as infile:
+        from bs4 import BeautifulSoup
+        with self.store.open("scholarly.html") as infile:
             return BeautifulSoup(infile, "lxml")
 
     def get_fulltext_xml(self):
-        with open(self.fulltextxmlpath, "r") as infile:
-            return etree.parse(infile)
+        """
+        Returns the fulltext.xml as lxml ElementTree,
+        parsed only once per CTree.
+        """
+        if self._fulltext_xml is None:
+            self._fulltext_xml = etree.parse(self.store.source("fulltext.xml"), XMLPARSER)
+        return self._fulltext_xml
+
+    def get_fulltext_fields(self, *fields):
+        """
+        Extracts several fields from the fulltext.xml in one pass.
+        If only front-matter fields are requested and the fulltext.xml
+        has not been parsed yet, parsing stops after <front>,
+        which is kept for later front-matter requests.
+
+        Args: fields = any of "keywords", "journal", "affiliations", "references"
+        Returns: {"keywords": [...], "journal": "string", ...}
+        """
+        if self._fulltext_xml is None and set(fields) <= jats.FRONT_FIELDS:
+            if self._front is None:
+                self._front = jats.parse_front(self.store.source("fulltext.xml"))
+            if self._front is not None:
+                return jats.extract_fields(self._front, fields)
+        return jats.extract_fields(self.get_fulltext_xml().getroot(), fields)
+
+    def extract_text(self, *fields):
+        """
+        Extracts several text sections of the scholarly.html in one pass.
+        Args: fields = "abstract", "acknowledgements", "competing_interests"
+                       or section titles
+        Returns: {field: "string"}
+        """
+        from . import textextract
+        return textextract.extract_file(self.store.source("scholarly.html"), fields)
 
     def get_section(self, section_title):
         """
@@ -318,13 +688,9 @@ class CTree(object):
             if sec.string == section_title:
                 for sib in sec.next_siblings:
                     section.append(sib.string)
-        try:
-            section = " ".join(section)
-            section = " ".join(section.split())
-        except:
-            # needs logging of empty section for document
-            section = ""
-        return section
+        # siblings without a single string have .string None
+        section = " ".join(text for text in section if text is not None)
+        return " ".join(section.split())
 
     def get_authors(self):
         """
@@ -340,22 +706,29 @@ class CTree(object):
 
     def get_keywords(self):
         """
-        Searches the scholarly.html for the contrib-group tag,
-        returns a list of authors.
+        Searches the fulltext.xml for kwd tags,
+        returns a list of keywords.
         """
-        keywords = [kwd.text for kwd in self.get_fulltext_xml().getroot().xpath("//kwd")]
-        return keywords
+        return self.get_fulltext_fields("keywords")["keywords"]
 
     def get_institutions(self):
         """
-        Searches the scholarly.html for the contrib-group tag,
-        returns a list of authors.
+        Searches the fulltext.xml for aff tags,
+        returns a list of affiliations.
         """
-        institutions = []
-        return institutions
+        return self.get_fulltext_fields("affiliations")["affiliations"]
 
     def get_journal(self):
-        return self.get_fulltext_xml().getroot().xpath("//journal-title/text()")[0]
+        """
+        Returns the journal title from the fulltext.xml, None if missing.
+        """
+        return self.get_fulltext_fields("journal")["journal"]
+
+    def get_references(self):
+        """
+        Returns a list of the references in the fulltext.xml as plain text.
+        """
+        return self.get_fulltext_fields("references")["references"]
 
     def get_acknowledgements(self):
         return self.get_section("Acknowledgements")
@@ -399,11 +772,7 @@ class CTree(object):
         cis = []
         for ci in self.query_soup("b", "Competing interests"):
             cis.append(ci.find_next().string)
-        try:
-            text = " ".join(cis)
-        except:
-            # needs logging of empty text for document
-            text = ""
+        text = " ".join(ci for ci in cis if ci is not None)
         text = " ".join(text.split())
         return text
 
@@ -417,11 +786,7 @@ class CTree(object):
         for ab in self.get_shtml().find_all("div", {"tag":"abstract"}):
             for p in ab.find_all("p"):
                 abstract.append(p.string)
-        try:
-            return " ".join(abstract)
-        except:
-            # needs logging for missing abstract in document
-            return ""
+        return " ".join(text for text in abstract if text is not None)
 
     def get_title(self):
         """
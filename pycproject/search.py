@@ -0,0 +1,184 @@
+#!/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""
+Full-text search over the sections of all scholarly.html in a CProject,
+backed by an SQLite FTS5 index.
+"""
+
+import os
+import sqlite3
+from lxml import etree, html
+
+from . import parallel
+from . import textextract
+
+
+__author__ = "Christopher Kittel"
+__copyright__ = "Copyright 2015"
+__license__ = "MIT"
+__version__ = "0.1.3"
+__maintainer__ = "Christopher Kittel"
+__email__ = "web@christopherkittel.eu"
+__status__ = "Prototype" # 'Development', 'Production' or 'Prototype'
+
+
+INDEXFILE = "fulltext_index.sqlite"
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS ctrees (ID TEXT PRIMARY KEY, mtime REAL);
+CREATE VIRTUAL TABLE IF NOT EXISTS sections USING fts5(ID UNINDEXED, section, text);
+"""
+
+
+def _quote(text):
+    """
+    Returns text as FTS5 string, matched literally.
+    """
+    return '"%s"' % text.replace('"', '""')
+
+
+def _read_sections(_, task):
+    store, mtime = task
+    ctreeID = store.ID
+    try:
+        root = html.parse(store.source("scholarly.html"),
+                          textextract.HTMLPARSER).getroot()
+    except (OSError, etree.LxmlError):
+        # unreadable or empty scholarly.html, index it as empty
+        return ctreeID, mtime, []
+    if root is None:
+        return ctreeID, mtime, []
+    return ctreeID, mtime, textextract.split_sections(root)
+
+
+class CProjectIndex(object):
+    """
+    Full-text index of a CProject.
+    By default the index is stored as fulltext_index.sqlite in the project folder,
+    or next to the archive for packed CProjects.
+
+    >>> index = CProjectIndex(MYPROJECT)
+    >>> index.build(workers=4)
+    >>> index.search("homo sapiens", phrase=True, section="Methods")
+    [{'ID': 'PMC4590491', 'section': 'Methods', 'snippet': '...samples of [Homo sapiens] were...'}]
+    """
+
+    def __init__(self, cproject, dbpath=None):
+        self.cproject = cproject
+        if dbpath is None:
+            if cproject.archive is not None:
+                # a packed CProject is a single file, keep the index next to it
+                dbpath = os.path.splitext(cproject.projectfolder)[0] + "_" + INDEXFILE
+            else:
+                dbpath = os.path.join(cproject.projectfolder, INDEXFILE)
+        self.dbpath = dbpath
+        self.connection = sqlite3.connect(self.dbpath)
+        self.connection.executescript(SCHEMA)
+
+    def _changed_ctrees(self, present):
+        """
+        Yields (store, mtime) for CTrees whose scholarly.html
+        is not indexed yet or changed since it was indexed.
+        Adds the IDs of all CTrees with a scholarly.html to the set present.
+        """
+        indexed = dict(self.connection.execute("SELECT ID, mtime FROM ctrees"))
+        for store in self.cproject.get_stores():
+            try:
+                mtime = store.mtime("scholarly.html")
+            except OSError:
+                # no scholarly.html
+                continue
+            present.add(store.ID)
+            if indexed.get(store.ID) != mtime:
+                yield store, mtime
+
+    def build(self, workers=None, chunksize=16, commit_every=1000):
+        """
+        Adds new and changed CTrees to the index and removes CTrees
+        that are gone or have no scholarly.html anymore.
+        Returns the number of CTrees indexed.
+        Documents are parsed in parallel, the index is written by this process.
+
+        Args: workers = int, number of processes, defaults to os.cpu_count()
+                        use 1 to index in the current process
+        """
+        present = set()
+        documents = parallel.imap(_read_sections, self._changed_ctrees(present),
+                                  workers, chunksize, ordered=False)
+        count = self._write(documents, commit_every)
+        self._remove(present)
+        return count
+
+    def _remove(self, present):
+        """
+        Deletes all indexed CTrees whose ID is not in present.
+        """
+        removed = [(ctreeID,) for ctreeID, in self.connection.execute("SELECT ID FROM ctrees")
+                   if ctreeID not in present]
+        with self.connection:
+            self.connection.executemany("DELETE FROM sections WHERE ID = ?", removed)
+            self.connection.executemany("DELETE FROM ctrees WHERE ID = ?", removed)
+
+    def _write(self, documents, commit_every):
+        count = 0
+        with self.connection:
+            for ctreeID, mtime, sections in documents:
+                self.connection.execute("DELETE FROM sections WHERE ID = ?", (ctreeID,))
+                self.connection.executemany(
+                    "INSERT INTO sections (ID, section, text) VALUES (?, ?, ?)",
+                    ((ctreeID, section, text) for section, text in sections))
+                self.connection.execute("INSERT OR REPLACE INTO ctrees VALUES (?, ?)",
+                                        (ctreeID, mtime))
+                count += 1
+                if count % commit_every == 0:
+                    self.connection.commit()
+        return count
+
+    def search(self, query, section=None, phrase=False, limit=100, raw=False):
+        """
+        Searches the index, best matches first.
+        By default every whitespace-separated term of the query is searched
+        literally and all of them must match, e.g. "COVID-19 mouse".
+        Returns a list of dicts {"ID": ctreeID, "section": "string", "snippet": "string"}
+
+        Args: query = "string"
+              section = "string", only search sections with this title, e.g. "abstract"
+              phrase = bool, search for the query as exact phrase
+              limit = int
+              raw = bool, the query is in FTS5 query syntax, e.g. "gene AND mouse*"
+        Raises: ValueError if the index cannot run the query
+        """
+        if phrase:
+            query = _quote(query)
+        elif not raw:
+            query = " ".join(_quote(term) for term in query.split())
+        sql = ("SELECT ID, section, snippet(sections, 2, '[', ']', '...', 12) "
+               "FROM sections WHERE sections MATCH ?")
+        params = ["text : (%s)" % query]
+        if section is not None:
+            sql += " AND section = ?"
+            params.append(section)
+        sql += " ORDER BY rank LIMIT ?"
+        params.append(limit)
+        try:
+            return [{"ID": ctreeID, "section": sec, "snippet": snippet}
+                    for ctreeID, sec, snippet in self.connection.execute(sql, params)]
+        except sqlite3.OperationalError as e:
+            raise ValueError("Cannot search for %r: %s" %(query, e))
+
+    def search_ids(self, query, section=None, phrase=False, raw=False):
+        """
+        Returns the set of CTree IDs matching a query, see search.
+        """
+        return {result["ID"] for result in self.search(query, section, phrase, limit=-1,
+                                                      raw=raw)}
+
+    def close(self):
+        self.connection.close()
+
+    def __len__(self):
+        return self.connection.execute("SELECT count(*) FROM ctrees").fetchone()[0]
+
+    def __repr__(self):
+        return '<CProjectIndex: {}>'.format(self.cproject.projectname)
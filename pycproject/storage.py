@@ -0,0 +1,289 @@
+#!/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""
+Gives CTrees access to their files, either from the usual directory layout
+or from a packed single-file CProject archive.
+
+A packed archive contains all files of all CTrees one after another,
+each optionally zlib-compressed, followed by a JSON index with the offset
+of every member. Members are read by random access through mmap,
+so a cold scan reads one file instead of millions of small ones.
+
+Pack a CProject with
+python3 -m pycproject.storage --raw PATH/TO/CPROJECT --name CPROJECTNAME --output PATH/TO/CPROJECTNAME.cpack
+"""
+
+import io
+import os
+import json
+import mmap
+import zlib
+import struct
+
+
+__author__ = "Christopher Kittel"
+__copyright__ = "Copyright 2015"
+__license__ = "MIT"
+__version__ = "0.1.3"
+__maintainer__ = "Christopher Kittel"
+__email__ = "web@christopherkittel.eu"
+__status__ = "Prototype" # 'Development', 'Production' or 'Prototype'
+
+
+MAGIC = b"CPACK1\n\0"
+# offset and length of the index, followed by MAGIC
+TRAILER = struct.Struct("<QQ")
+TRAILERSIZE = TRAILER.size + len(MAGIC)
+
+
+class DirectoryStore(object):
+    """
+    Files of a CTree in its folder.
+    All paths are relative to the CTree folder.
+    """
+
+    def __init__(self, ctreepath):
+        self.path = ctreepath
+        self.ID = os.path.basename(ctreepath)
+
+    def _fullpath(self, relpath):
+        return os.path.join(self.path, relpath)
+
+    def source(self, relpath):
+        """
+        Returns something lxml can parse: here the path itself,
+        so libxml2 reads the file without a python copy.
+        """
+        return self._fullpath(relpath)
+
+    def open(self, relpath):
+        return open(self._fullpath(relpath), "rb")
+
+    def read(self, relpath):
+        with self.open(relpath) as infile:
+            return infile.read()
+
+    def listdir(self, relpath=""):
+        return os.listdir(self._fullpath(relpath))
+
+    def exists(self, relpath):
+        return os.path.exists(self._fullpath(relpath))
+
+    def mtime(self, relpath):
+        return os.stat(self._fullpath(relpath)).st_mtime
+
+    def manifest(self, onerror=None):
+        """
+        Returns the set of all files in the CTree folder as relative paths,
+        subfolders are included with a trailing "/".
+        Walks the folder once, so existence checks need no further stat calls.
+
+        Args: onerror = function called with the OSError of unreadable folders
+        """
+        entries = set()
+        for dirpath, dirnames, filenames in os.walk(self.path, onerror=onerror):
+            reldir = os.path.relpath(dirpath, self.path).replace(os.sep, "/")
+            prefix = "" if reldir == "." else reldir + "/"
+            entries.update(prefix + dirname + "/" for dirname in dirnames)
+            entries.update(prefix + filename for filename in filenames)
+        return entries
+
+    def __repr__(self):
+        return '<DirectoryStore: {}>'.format(self.path)
+
+
+class CProjectArchive(object):
+    """
+    Read access to a packed CProject archive.
+    """
+
+    def __init__(self, archivepath):
+        self.path = archivepath
+        self._file = open(archivepath, "rb")
+        self._mmap = mmap.mmap(self._file.fileno(), 0, access=mmap.ACCESS_READ)
+        trailer = self._mmap[-TRAILERSIZE:]
+        if trailer[TRAILER.size:] != MAGIC:
+            self.close()
+            raise ValueError("%s is not a packed CProject" %archivepath)
+        offset, length = TRAILER.unpack(trailer[:TRAILER.size])
+        self.index = json.loads(self._mmap[offset:offset+length].decode("utf-8"))
+        self.ctrees = self.index["ctrees"]
+
+    def get_ctree_ids(self):
+        return list(self.ctrees)
+
+    def get_store(self, ctreeID):
+        if ctreeID not in self.ctrees:
+            raise KeyError("%s is not in %s" %(ctreeID, self.path))
+        return ArchiveStore(self, ctreeID)
+
+    def read(self, ctreeID, relpath):
+        """
+        Returns the content of a member as bytes.
+        """
+        try:
+            offset, length, compressed, _ = self.ctrees[ctreeID][relpath]
+        except KeyError:
+            raise FileNotFoundError(os.path.join(self.path, ctreeID, relpath))
+        data = self._mmap[offset:offset+length]
+        if compressed:
+            data = zlib.decompress(data)
+        return data
+
+    def close(self):
+        self._mmap.close()
+        self._file.close()
+
+    def __getstate__(self):
+        # the mmap cannot be sent to worker processes, they reopen the archive
+        return {"path": self.path}
+
+    def __setstate__(self, state):
+        self.__init__(state["path"])
+
+    def __repr__(self):
+        return '<CProjectArchive: {}>'.format(self.path)
+
+
+def _member(relpath):
+    """
+    Archive members always use "/" as separator.
+    """
+    return os.path.normpath(relpath).replace(os.sep, "/") if relpath else relpath
+
+
+class ArchiveStore(object):
+    """
+    Files of a CTree in a packed CProject archive.
+    Same interface as DirectoryStore.
+    """
+
+    def __init__(self, archive, ctreeID):
+        self.archive = archive
+        self.ID = ctreeID
+        self.path = os.path.join(archive.path, ctreeID)
+        self._members = archive.ctrees[ctreeID]
+
+    def source(self, relpath):
+        return self.open(relpath)
+
+    def open(self, relpath):
+        return io.BytesIO(self.read(relpath))
+
+    def read(self, relpath):
+        return self.archive.read(self.ID, _member(relpath))
+
+    def listdir(self, relpath=""):
+        relpath = _member(relpath)
+        prefix = relpath.rstrip("/") + "/" if relpath else ""
+        entries = set(member[len(prefix):].split("/")[0]
+                      for member in self._members if member.startswith(prefix))
+        if not entries:
+            raise FileNotFoundError(os.path.join(self.path, relpath))
+        return sorted(entries)
+
+    def exists(self, relpath):
+        relpath = _member(relpath)
+        if relpath in self._members:
+            return True
+        prefix = relpath.rstrip("/") + "/"
+        return any(member.startswith(prefix) for member in self._members)
+
+    def mtime(self, relpath):
+        try:
+            return self._members[_member(relpath)][3]
+        except KeyError:
+            raise FileNotFoundError(os.path.join(self.path, relpath))
+
+    def manifest(self, onerror=None):
+        """
+        Returns the set of all files of the CTree as relative paths,
+        with their folders included with a trailing "/", like DirectoryStore.manifest.
+        """
+        entries = set(self._members)
+        for member in self._members:
+            parts = member.split("/")[:-1]
+            entries.update("/".join(parts[:i]) + "/" for i in range(1, len(parts)+1))
+        return entries
+
+    def __reduce__(self):
+        return (_archive_store, (self.archive.path, self.ID))
+
+    def __repr__(self):
+        return '<ArchiveStore: {}>'.format(self.path)
+
+
+# archives opened in worker processes, so stores sent to a worker
+# share one open archive instead of reading the index per CTree
+_archives = {}
+
+def _archive_store(archivepath, ctreeID):
+    if archivepath not in _archives:
+        _archives[archivepath] = CProjectArchive(archivepath)
+    return _archives[archivepath].get_store(ctreeID)
+
+
+def pack(projectfolder, archivepath, compress=True, level=6):
+    """
+    Packs all CTrees of a CProject folder into a single archive file.
+    Members are only stored compressed if that makes them smaller.
+    Returns the number of CTrees packed.
+    """
+    ctrees = {}
+    tmppath = archivepath + ".tmp"
+    with open(tmppath, "wb") as outfile:
+        for ctreeID in sorted(os.listdir(projectfolder)):
+            ctreepath = os.path.join(projectfolder, ctreeID)
+            if not os.path.isdir(ctreepath):
+                continue
+            members = {}
+            for dirpath, dirnames, filenames in os.walk(ctreepath):
+                dirnames.sort()
+                for filename in sorted(filenames):
+                    fullpath = os.path.join(dirpath, filename)
+                    relpath = os.path.relpath(fullpath, ctreepath).replace(os.sep, "/")
+                    with open(fullpath, "rb") as infile:
+                        data = infile.read()
+                    compressed = False
+                    if compress:
+                        packed = zlib.compress(data, level)
+                        if len(packed) < len(data):
+                            data, compressed = packed, True
+                    members[relpath] = [outfile.tell(), len(data), compressed,
+                                        os.stat(fullpath).st_mtime]
+                    outfile.write(data)
+            ctrees[ctreeID] = members
+        index = json.dumps({"projectname": os.path.basename(projectfolder.rstrip(os.sep)),
+                            "ctrees": ctrees}).encode("utf-8")
+        offset = outfile.tell()
+        outfile.write(index)
+        outfile.write(TRAILER.pack(offset, len(index)) + MAGIC)
+    os.replace(tmppath, archivepath)
+    return len(ctrees)
+
+
+def is_archive(path):
+    """
+    Returns True if path is a packed CProject archive.
+    """
+    if not os.path.isfile(path) or os.path.getsize(path) < TRAILERSIZE:
+        return False
+    with open(path, "rb") as infile:
+        infile.seek(-len(MAGIC), os.SEEK_END)
+        return infile.read() == MAGIC
+
+
+def main(args):
+    n = pack(os.path.join(args.raw, args.name), args.output, not args.no_compression)
+    print("Packed %d CTrees into %s" %(n, args.output))
+
+if __name__ == '__main__':
+    import argparse
+    parser = argparse.ArgumentParser(description='pack a CProject into a single archive file')
+    parser.add_argument('--raw', dest='raw', help='relative or absolute path of the raw data folder', required=True)
+    parser.add_argument('--name', dest='name', help='name of the CProject', required=True)
+    parser.add_argument('--output', dest='output', help='relative or absolute path of the archive', required=True)
+    parser.add_argument('--no-compression', dest='no_compression', action='store_true', help='store members uncompressed')
+    args = parser.parse_args()
+    main(args)
@@ -0,0 +1,210 @@
+#!/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""
+Extracts text sections from the scholarly.html of many CTrees,
+parsing each document once and walking its tree a single time
+for all requested fields.
+"""
+
+import re
+import json
+from itertools import islice
+from lxml import etree, html
+
+from . import parallel
+from .readctree import ScanReport
+
+
+__author__ = "Christopher Kittel"
+__copyright__ = "Copyright 2015"
+__license__ = "MIT"
+__version__ = "0.1.3"
+__maintainer__ = "Christopher Kittel"
+__email__ = "web@christopherkittel.eu"
+__status__ = "Prototype" # 'Development', 'Production' or 'Prototype'
+
+
+# fields with special extraction rules,
+# any other field name is read as the title of a section
+SECTION_TITLES = {"acknowledgements": "Acknowledgements"}
+COMPETING_INTERESTS = re.compile("Competing interests")
+HEADINGS = {"h1", "h2", "h3", "h4", "h5", "h6"}
+# scholarly.html is written as UTF-8, often without a meta charset,
+# in which case libxml2 would fall back to Latin-1
+HTMLPARSER = html.HTMLParser(encoding="utf-8")
+
+
+def _clean(texts):
+    return " ".join(" ".join(t for t in texts if t).split())
+
+
+def _string(elem):
+    """
+    Returns the text of an element if it is its only content,
+    like BeautifulSoup's Tag.string.
+    """
+    if len(elem) == 0:
+        return elem.text
+    return None
+
+
+def extract_sections(root, fields):
+    """
+    Walks a parsed scholarly.html once,
+    returns a dict {field: "text"} for all fields.
+
+    Args: root = lxml.html element
+          fields = ["abstract", "competing_interests", "acknowledgements", "Methods", ...]
+    """
+    collected = {field: [] for field in fields}
+    titles = {}
+    for field in fields:
+        if field not in ("abstract", "competing_interests"):
+            titles[SECTION_TITLES.get(field, field)] = field
+    want_abstract = "abstract" in collected
+    want_cis = "competing_interests" in collected
+
+    for elem in root.iter():
+        if not isinstance(elem.tag, str):
+            continue
+        if want_abstract and elem.tag == "div" and elem.get("tag") == "abstract":
+            collected["abstract"].extend(p.text_content() for p in elem.iter("p"))
+            continue
+        string = _string(elem)
+        if string is None:
+            continue
+        if titles and string in titles:
+            texts = collected[titles[string]]
+            texts.extend(sib.text_content() for sib in elem.itersiblings())
+        elif want_cis and elem.tag == "b" and COMPETING_INTERESTS.search(string):
+            following = elem.xpath("following::*[1]")
+            if following:
+                collected["competing_interests"].append(following[0].text_content())
+
+    return {field: _clean(texts) for field, texts in collected.items()}
+
+
+def split_sections(root):
+    """
+    Splits a parsed scholarly.html into its titled sections,
+    returns a list of (section title, "text") tuples.
+    The text of a section is everything following its heading
+    within the same parent element, up to the next heading.
+    """
+    sections = []
+    title = root.find(".//title")
+    if title is not None and title.text_content().strip():
+        sections.append(("title", _clean([title.text_content()])))
+    for elem in root.iter():
+        if not isinstance(elem.tag, str):
+            continue
+        if elem.tag == "div" and elem.get("tag") == "abstract":
+            sections.append(("abstract", _clean(p.text_content() for p in elem.iter("p"))))
+        elif elem.tag in HEADINGS:
+            heading = _clean([elem.text_content()])
+            texts = []
+            for sib in elem.itersiblings():
+                if sib.tag in HEADINGS:
+                    break
+                texts.append(sib.text_content())
+            text = _clean(texts)
+            if heading and text:
+                sections.append((heading, text))
+    return sections
+
+
+def extract_file(source, fields):
+    """
+    Parses a scholarly.html file and extracts all fields from it.
+    Source may be a path or a file object.
+    A document without content gives empty fields.
+    """
+    root = html.parse(source, HTMLPARSER).getroot()
+    if root is None:
+        return {field: "" for field in fields}
+    return extract_sections(root, fields)
+
+
+def _extract_row(fields, store):
+    """
+    Returns the row of one CTree and the ScanReport of reading it.
+    Unreadable, empty or broken scholarly.html give empty fields.
+    """
+    row = {"ID": store.ID}
+    row.update({field: "" for field in fields})
+    report = ScanReport()
+    if store.exists("scholarly.html"):
+        try:
+            root = html.parse(store.source("scholarly.html"), HTMLPARSER).getroot()
+            if root is None:
+                raise etree.ParserError("Document is empty")
+        except (OSError, etree.LxmlError) as e:
+            report.record_error(e, "/".join((store.path, "scholarly.html")))
+        else:
+            row.update(extract_sections(root, fields))
+    return row, report
+
+
+def iter_rows(stores, fields, workers=None, chunksize=16, report=None):
+    """
+    Yields one dict {"ID": ctreeID, field: "text", ...} per CTree.
+    Only a window of CTrees is handed to the workers at a time,
+    so memory stays bounded for large projects.
+
+    Args: stores = iterable of CTree storage objects, see CProject.get_stores
+          workers = int, number of processes, defaults to os.cpu_count()
+                    use 1 to extract in the current process
+          report = ScanReport to record unreadable files in
+    """
+    if report is None:
+        report = ScanReport()
+    return parallel.imap(_extract_row, stores, workers, chunksize,
+                         context=list(fields), report=report)
+
+
+def write_jsonl(rows, outputfile):
+    with open(outputfile, "w") as outfile:
+        for row in rows:
+            outfile.write(json.dumps(row)+"\n")
+
+
+def write_parquet(rows, outputfile, batchsize=1000):
+    """
+    Writes rows to a parquet file in row groups of batchsize.
+    Needs pyarrow.
+    """
+    try:
+        import pyarrow as pa
+        import pyarrow.parquet as pq
+    except ImportError:
+        raise ImportError("Writing parquet files needs pyarrow, install it with pip install pyarrow")
+    writer = None
+    try:
+        while True:
+            batch = list(islice(rows, batchsize))
+            if not batch:
+                break
+            table = pa.Table.from_pylist(batch)
+            if writer is None:
+                writer = pq.ParquetWriter(outputfile, table.schema)
+            writer.write_table(table)
+    finally:
+        if writer is not None:
+            writer.close()
+
+
+def extract_text(stores, fields, workers=None, output=None, report=None):
+    """
+    Extracts text fields for all CTrees, see iter_rows.
+    Returns a generator of row dicts if output is None,
+    otherwise writes them to output, as parquet if it ends in .parquet
+    and as JSON lines otherwise.
+    """
+    rows = iter_rows(stores, fields, workers, report=report)
+    if output is None:
+        return rows
+    if output.endswith(".parquet"):
+        write_parquet(rows, output)
+    else:
+        write_jsonl(rows, output)
@@ -12,9 +12,13 @@ setup(name='pycproject',
       ],
       license='MIT',
       packages=['pycproject'],
+      python_requires='>=3.8',
       install_requires=[
         'lxml>=3.5.0',
         'beautifulsoup4>=4.4.1',
         'pandas>=0.19.2'
       ],
+      extras_require={
+        'parquet': ['pyarrow']
+      },
       zip_safe=False)
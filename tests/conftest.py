@@ -0,0 +1,73 @@
+import os
+import json
+
+import pytest
+
+
+ABSTRACT = "We study Homo sapiens and Mus musculus in paper %d."
+
+SCHOLARLY_HTML = """<html><head><title>Paper %d</title></head><body>
+<div class="contrib-group"><span class="citation_author">Ada Lovelace</span></div>
+<div tag="abstract"><h2>Abstract</h2><p>""" + ABSTRACT + """</p></div>
+<div><h2>Methods</h2><p>Samples of Escherichia coli were used.</p><p>More methods.</p>
+<h2>Results</h2><p>Nothing else.</p></div>
+<div><h2>Acknowledgements</h2><p>Thanks to the funders.</p></div>
+<p><b>Competing interests</b></p><p>The authors declare none.</p>
+</body></html>"""
+
+FULLTEXT_XML = """<?xml version="1.0"?>
+<article><front><journal-meta><journal-title-group><journal-title>PLoS One</journal-title></journal-title-group></journal-meta>
+<article-meta><contrib-group><aff id="a1"><label>1</label>University of Vienna</aff></contrib-group>
+<kwd-group><kwd>mice</kwd><kwd>genes</kwd></kwd-group></article-meta></front>
+<body><sec><title>Intro</title><p>Homo sapiens is studied with Mus musculus.</p></sec></body>
+<back><ref-list><ref id="r1"><label>1</label><mixed-citation><article-title>A ref title</article-title> 2001</mixed-citation></ref></ref-list></back></article>"""
+
+# no <front>, so front-matter fields need the whole document
+FULLTEXT_XML_WITHOUT_FRONT = """<?xml version="1.0"?>
+<article><body><sec><title>Intro</title><p>No front matter.</p>
+<kwd-group><kwd>orphan</kwd></kwd-group></sec></body></article>"""
+
+RESULTS_XML = """<results title="binomial">
+<result pre="We study " exact="Homo sapiens" post=" and" name="binomial" xpath="/x"/>
+<result pre="and " exact="Mus musculus" post=" in" name="binomial" xpath="/y"/>
+</results>"""
+
+
+def _write(path, content):
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    with open(path, "w", encoding="utf-8") as outfile:
+        outfile.write(content)
+
+
+def make_cproject(projectpath, projectname="project", size=6):
+    """
+    Writes a small CProject of size CTrees PMC100, PMC101, ... to projectpath.
+    Every second CTree has entities, the last one has no results,
+    and PMC101 has a fulltext.xml without <front>.
+    """
+    projectfolder = os.path.join(projectpath, projectname)
+    for i in range(size):
+        ctreepath = os.path.join(projectfolder, "PMC%d" %(100 + i))
+        metadata = {"title": ["Paper %d about Homo sapiens" %i],
+                    "pmcid": ["PMC%d" %(100 + i)],
+                    "firstPublicationDate": ["20%02d-0%d-1%d" %(10 + i % 3, 1 + i % 9, i)],
+                    "authorList": [{"author": [{"fullName": ["A B"]}]}]}
+        _write(os.path.join(ctreepath, "eupmc_result.json"), json.dumps(metadata))
+        if i % 2 == 0:
+            _write(os.path.join(ctreepath, "entities"), json.dumps({"PERSON": ["x"]}))
+        _write(os.path.join(ctreepath, "scholarly.html"), SCHOLARLY_HTML %(i, i))
+        _write(os.path.join(ctreepath, "fulltext.xml"),
+               FULLTEXT_XML_WITHOUT_FRONT if i == 1 else FULLTEXT_XML)
+        if i != size - 1:
+            _write(os.path.join(ctreepath, "results", "species", "binomial", "results.xml"),
+                   RESULTS_XML)
+    return projectfolder
+
+
+@pytest.fixture
+def cproject_folder(tmp_path):
+    """
+    Returns (projectpath, projectname) of a fresh CProject.
+    """
+    make_cproject(str(tmp_path))
+    return str(tmp_path), "project"
@@ -0,0 +1,76 @@
+import os
+import json
+import shutil
+
+import pytest
+
+from pycproject import storage
+from pycproject.collection import CProjectCollection
+from conftest import make_cproject
+
+
+def repr_ctree(ctree):
+    return repr(ctree)
+
+
+@pytest.fixture
+def cprojects(tmp_path):
+    """
+    Three CProjects: "a" with PMC100-105, "b" with PMC100-107,
+    and "c" packed, with PMC100-101 stored under other IDs but the same PMCIDs.
+    """
+    projectpath = str(tmp_path)
+    make_cproject(projectpath, "a")
+    make_cproject(projectpath, "b", size=8)
+    make_cproject(projectpath, "c", size=2)
+    for ctreeID in ("PMC100", "PMC101"):
+        os.rename(os.path.join(projectpath, "c", ctreeID),
+                  os.path.join(projectpath, "c", "copy_" + ctreeID))
+    storage.pack(os.path.join(projectpath, "c"), os.path.join(projectpath, "c.cpack"))
+    shutil.rmtree(os.path.join(projectpath, "c"))
+    with open(os.path.join(projectpath, "species.xml"), "w") as outfile:
+        outfile.write("<dictionary/>")
+    return projectpath
+
+
+def test_from_folder(cprojects):
+    collection = CProjectCollection.from_folder(cprojects)
+    assert [cp.projectname for cp in collection.cprojects] == ["a", "b", "c.cpack"]
+
+
+def test_dedup_by_id(cprojects):
+    collection = CProjectCollection.from_folder(cprojects)
+    entries = collection.get_entries()
+    assert len(collection) == 10
+    assert entries["PMC100"][0].projectname == "a"
+    assert entries["PMC107"][0].projectname == "b"
+    assert collection.sources["PMC100"] == ["a", "b"]
+    assert collection.sources["copy_PMC100"] == ["c.cpack"]
+
+
+def test_dedup_by_pmcid(cprojects):
+    collection = CProjectCollection.from_folder(cprojects, dedup="pmcid")
+    assert len(collection) == 8
+    assert collection.sources["PMC100"] == ["a", "b", "c.cpack"]
+    with pytest.raises(ValueError):
+        CProjectCollection.from_folder(cprojects, dedup="title")
+
+
+def test_results_serial_and_pool(cprojects):
+    collection = CProjectCollection.from_folder(cprojects, dedup="pmcid")
+    serial = sorted(json.dumps(result, sort_keys=True) for result in collection.get_results())
+    # PMC105 of "a" and PMC107 of "b" have no results
+    assert len(serial) == 2 * 6
+    assert serial == sorted(json.dumps(result, sort_keys=True)
+                            for result in collection.get_results(workers=2))
+    assert collection.report.counts["no results"] == 2
+    assert set(collection.get_dataframe()["cproject"]) == {"a", "b"}
+
+
+def test_map_and_cache(cprojects):
+    collection = CProjectCollection.from_folder(cprojects, cachesize=2)
+    serial = list(collection.map(repr_ctree))
+    assert serial == list(collection.map(repr_ctree, workers=2))
+    assert serial[0] == ("a", "PMC100", "<CTree: PMC100>")
+    assert len(collection._cache) == 2
+    assert collection.get_ctree("PMC107") is collection.get_ctree("PMC107")
@@ -0,0 +1,90 @@
+import os
+
+from pycproject import storage
+from pycproject.dictmatch import DictionaryMatcher, read_amidict, _fold
+from pycproject.readctree import CProject
+
+
+def _exact(matcher, text):
+    return [(result["exact"], result["name"]) for result in matcher.match_text(text)]
+
+
+def test_overlapping_and_nested_terms():
+    matcher = DictionaryMatcher(["homo sapiens", "sapiens", "homo", "sapiens neanderthalensis"])
+    assert len(matcher) == 4
+    assert sorted(_exact(matcher, "Homo sapiens neanderthalensis")) == sorted([
+        ("Homo", "homo"), ("Homo sapiens", "homo sapiens"), ("sapiens", "sapiens"),
+        ("sapiens neanderthalensis", "sapiens neanderthalensis")])
+
+
+def test_failure_links():
+    # "a b c" fails over to "b c", which is found inside the longer term
+    matcher = DictionaryMatcher(["a b c d", "b c", "c x"])
+    assert sorted(matcher.find("a b c x")) == [(2, 5, "b c"), (4, 7, "c x")]
+    assert sorted(matcher.find("a b c d")) == [(0, 7, "a b c d"), (2, 5, "b c")]
+
+
+def test_word_boundaries():
+    matcher = DictionaryMatcher(["coli", "e. coli"])
+    assert _exact(matcher, "E. coli") == [("E. coli", "e. coli"), ("coli", "coli")]
+    assert _exact(matcher, "broccoli colitis coli2") == []
+    assert _exact(matcher, "(coli),") == [("coli", "coli")]
+
+
+def test_context_and_names():
+    matcher = DictionaryMatcher([("mus musculus", "mouse")])
+    result = matcher.match_text("x" * 40 + " Mus musculus " + "y" * 40, xpath="/p")[0]
+    assert result == {"pre": "x" * 29 + " ", "exact": "Mus musculus",
+                      "post": " " + "y" * 29, "name": "mouse", "xpath": "/p"}
+
+
+def test_fold_keeps_offsets():
+    text = "İstanbul İİ HOMO sapiens"
+    assert len(_fold(text)) == len(text)
+    matcher = DictionaryMatcher(["homo sapiens", "x"])
+    assert _exact(matcher, "İİ x") == [("x", "x")]
+    assert _exact(matcher, "Homo sapiens İ homo sapiens") == [
+        ("Homo sapiens", "homo sapiens"), ("homo sapiens", "homo sapiens")]
+    for start, end, _ in matcher.find(text):
+        assert text[start:end] == "HOMO sapiens"
+
+
+def test_match_file(tmp_path):
+    path = str(tmp_path / "scholarly.html")
+    with open(path, "w", encoding="utf-8") as outfile:
+        outfile.write("<html><body><div><p>Müller studied <i>Homo sapiens</i> "
+                      "and Homo</p> sapiens</div></body></html>")
+    matcher = DictionaryMatcher(["homo sapiens", "müller"])
+    results = matcher.match_file(path)
+    # matches spanning several elements are not found
+    assert sorted((r["exact"], r["xpath"]) for r in results) == [
+        ("Homo sapiens", "/html/body/div/p/i"), ("Müller", "/html/body/div/p")]
+
+
+def test_read_amidict(tmp_path):
+    path = str(tmp_path / "species.xml")
+    with open(path, "w") as outfile:
+        outfile.write('<dictionary title="species"><entry term="homo sapiens" name="human"/>'
+                      '<entry term="mus musculus"/><entry name="empty"/></dictionary>')
+    assert read_amidict(path) == [("homo sapiens", "human"), ("mus musculus", "mus musculus")]
+    assert DictionaryMatcher.from_amidict(path).title == "species"
+
+
+def test_match_cproject_serial_pool_and_archive(cproject_folder):
+    projectpath, projectname = cproject_folder
+    # an empty fulltext is skipped and reported
+    with open(os.path.join(projectpath, projectname, "PMC103", "scholarly.html"), "w"):
+        pass
+    storage.pack(os.path.join(projectpath, projectname),
+                 os.path.join(projectpath, "project.cpack"))
+    matcher = DictionaryMatcher(["homo sapiens", "escherichia coli", "mus musculus"])
+    cproject = CProject(projectpath, projectname)
+    serial = sorted(matcher.match_cproject(cproject, workers=1))
+    assert [ctreeID for ctreeID, _ in serial] == ["PMC100", "PMC101", "PMC102",
+                                                  "PMC104", "PMC105"]
+    assert len(serial[0][1]) == 3
+    assert cproject.report.counts == {"xml error": 1}
+    assert sorted(matcher.match_cproject(cproject, workers=2, chunksize=1)) == serial
+    assert cproject.report.counts == {"xml error": 1}
+    archive = CProject(projectpath, "project.cpack")
+    assert sorted(matcher.match_cproject(archive, workers=2)) == serial
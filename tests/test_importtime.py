@@ -0,0 +1,22 @@
+import os
+import sys
+import subprocess
+
+import pytest
+
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+HEAVY = ["pandas", "bs4", "networkx", "matplotlib"]
+
+
+@pytest.mark.parametrize("module", ["pycproject.readctree", "pycproject.collection",
+                                    "pycproject.pipeline", "pycproject.jobs",
+                                    "pycproject.parallel", "pycproject.factnet"])
+def test_import_loads_no_heavy_modules(module):
+    code = "import sys, %s; print(' '.join(name for name in %r if name in sys.modules))" %(
+        module, HEAVY)
+    env = dict(os.environ, PYTHONPATH=ROOT)
+    output = subprocess.check_output([sys.executable, "-X", "importtime", "-c", code],
+                                     env=env, stderr=subprocess.DEVNULL,
+                                     universal_newlines=True)
+    assert output.split() == []
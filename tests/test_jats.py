@@ -0,0 +1,44 @@
+import io
+
+import pytest
+
+from pycproject import jats
+from conftest import FULLTEXT_XML, FULLTEXT_XML_WITHOUT_FRONT
+
+
+FIELDS = {"keywords": ["mice", "genes"],
+          "journal": "PLoS One",
+          "affiliations": ["University of Vienna"],
+          "references": ["A ref title 2001"]}
+
+
+@pytest.fixture
+def fulltext(tmp_path):
+    path = tmp_path / "fulltext.xml"
+    path.write_text(FULLTEXT_XML)
+    return str(path)
+
+
+def test_read_fields(fulltext):
+    assert jats.read_fields(fulltext, list(FIELDS)) == FIELDS
+    assert jats.read_fields(fulltext, ["journal", "keywords"]) == {
+        "journal": "PLoS One", "keywords": ["mice", "genes"]}
+
+
+def test_parse_front(fulltext):
+    front = jats.parse_front(fulltext)
+    assert front.tag == "front"
+    assert jats.extract_fields(front, ["references"]) == {"references": []}
+    assert jats.parse_front(io.BytesIO(FULLTEXT_XML_WITHOUT_FRONT.encode("utf-8"))) is None
+
+
+def test_read_fields_from_file_object():
+    for fulltext, keywords in ((FULLTEXT_XML, ["mice", "genes"]),
+                               (FULLTEXT_XML_WITHOUT_FRONT, ["orphan"])):
+        source = io.BytesIO(fulltext.encode("utf-8"))
+        assert jats.read_fields(source, ["keywords"]) == {"keywords": keywords}
+
+
+def test_unknown_fields(fulltext):
+    with pytest.raises(ValueError):
+        jats.read_fields(fulltext, ["keywords", "authors"])
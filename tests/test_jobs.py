@@ -0,0 +1,144 @@
+import os
+
+import pytest
+
+from pycproject import jobs
+from pycproject.jobs import CheckpointedJob
+from pycproject.readctree import CProject
+from conftest import make_cproject
+
+
+IDS = ["PMC%d\n" %(100 + i) for i in range(6)]
+
+
+def ids_and_titles(ctree):
+    return {"ids.txt": [ctree.ID + "\n"],
+            "titles.txt": [ctree.get_title() + "\n"]}
+
+
+class Crash(Exception):
+    pass
+
+
+def crash_at(ctreeID, seen):
+    def process(ctree):
+        seen.append(ctree.ID)
+        if ctree.ID == ctreeID:
+            raise Crash(ctreeID)
+        return ids_and_titles(ctree)
+    return process
+
+
+def _lines(path):
+    with open(path) as infile:
+        return infile.readlines()
+
+
+@pytest.fixture
+def cproject(cproject_folder):
+    return CProject(*cproject_folder)
+
+
+@pytest.fixture
+def out(tmp_path):
+    """
+    Output folder, next to the CProject.
+    """
+    path = tmp_path / "out"
+    path.mkdir()
+    return path
+
+
+def test_run(cproject, out):
+    outputpaths = CheckpointedJob(cproject, str(out), chunksize=4).run(ids_and_titles)
+    assert sorted(os.path.basename(path) for path in outputpaths) == ["ids.txt", "titles.txt"]
+    assert _lines(str(out / "ids.txt")) == IDS
+    assert not os.path.exists(str(out / ".job.checkpoint"))
+
+
+def test_resume_after_interrupted_chunk(cproject, out):
+    seen = []
+    with pytest.raises(Crash):
+        CheckpointedJob(cproject, str(out), chunksize=2).run(crash_at("PMC103", seen))
+    assert seen == ["PMC100", "PMC101", "PMC102", "PMC103"]
+    assert not os.path.exists(str(out / "ids.txt"))
+    seen = []
+    CheckpointedJob(cproject, str(out), chunksize=2).run(crash_at(None, seen))
+    # the first chunk is done, the interrupted one is processed again
+    assert seen == ["PMC102", "PMC103", "PMC104", "PMC105"]
+    assert _lines(str(out / "ids.txt")) == IDS
+    assert len(_lines(str(out / "titles.txt"))) == 6
+
+
+def test_resume_with_new_ctrees(cproject_folder, out):
+    projectpath, projectname = cproject_folder
+    cproject = CProject(projectpath, projectname)
+    with pytest.raises(Crash):
+        CheckpointedJob(cproject, str(out), chunksize=2).run(crash_at("PMC103", []))
+    # CTrees added in between are not part of the resumed job
+    make_cproject(projectpath, projectname, size=8)
+    CheckpointedJob(CProject(projectpath, projectname), str(out),
+                    chunksize=2).run(ids_and_titles)
+    assert _lines(str(out / "ids.txt")) == IDS
+
+
+def test_interrupted_finish_while_joining(cproject, out, monkeypatch):
+    with open(str(out / "ids.txt"), "w") as outfile:
+        outfile.write("existing\n")
+    copyfileobj = jobs.shutil.copyfileobj
+    calls = []
+
+    def crashing_copy(infile, outfile):
+        calls.append(infile)
+        if len(calls) == 3:
+            raise Crash()
+        copyfileobj(infile, outfile)
+
+    monkeypatch.setattr(jobs.shutil, "copyfileobj", crashing_copy)
+    with pytest.raises(Crash):
+        CheckpointedJob(cproject, str(out), chunksize=4, append=True).run(ids_and_titles)
+    monkeypatch.setattr(jobs.shutil, "copyfileobj", copyfileobj)
+    assert _lines(str(out / "ids.txt")) == ["existing\n"]
+    CheckpointedJob(cproject, str(out), chunksize=4, append=True).run(ids_and_titles)
+    assert _lines(str(out / "ids.txt")) == ["existing\n"] + IDS
+
+
+def test_interrupted_finish_while_replacing(cproject, out, monkeypatch):
+    with open(str(out / "ids.txt"), "w") as outfile:
+        outfile.write("existing\n")
+    replace = jobs.os.replace
+
+    def crashing_replace(src, dst):
+        if dst.endswith("titles.txt"):
+            raise Crash()
+        replace(src, dst)
+
+    monkeypatch.setattr(jobs.os, "replace", crashing_replace)
+    with pytest.raises(Crash):
+        CheckpointedJob(cproject, str(out), chunksize=4, append=True).run(ids_and_titles)
+    monkeypatch.setattr(jobs.os, "replace", replace)
+    # ids.txt was already moved into place, it must not be appended to again
+    assert _lines(str(out / "ids.txt")) == ["existing\n"] + IDS
+    CheckpointedJob(cproject, str(out), chunksize=4, append=True).run(ids_and_titles)
+    assert _lines(str(out / "ids.txt")) == ["existing\n"] + IDS
+    assert len(_lines(str(out / "titles.txt"))) == 6
+
+
+def test_append_and_replace(cproject, out):
+    for _ in range(2):
+        CheckpointedJob(cproject, str(out), chunksize=4, append=True).run(ids_and_titles)
+    assert _lines(str(out / "ids.txt")) == IDS + IDS
+    CheckpointedJob(cproject, str(out), chunksize=4).run(ids_and_titles)
+    assert _lines(str(out / "ids.txt")) == IDS
+
+
+def test_checkpoint_mismatch(cproject, out, tmp_path):
+    with pytest.raises(Crash):
+        CheckpointedJob(cproject, str(out), chunksize=2).run(crash_at("PMC103", []))
+    with pytest.raises(ValueError):
+        CheckpointedJob(cproject, str(out), chunksize=3).run(ids_and_titles)
+    otherpath = str(tmp_path / "other")
+    make_cproject(otherpath)
+    with pytest.raises(ValueError):
+        CheckpointedJob(CProject(otherpath, "project"), str(out),
+                        chunksize=2).run(ids_and_titles)
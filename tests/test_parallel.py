@@ -0,0 +1,33 @@
+from pycproject import parallel
+from pycproject.readctree import ScanReport
+
+
+def _scale(factor, task):
+    return task * factor
+
+
+def _scale_and_report(factor, task):
+    report = ScanReport()
+    if task % 10 == 0:
+        report.record("missing file", str(task))
+    return task * factor, report
+
+
+def test_imap_serial_and_pool():
+    tasks = range(200)
+    expected = [task * 3 for task in tasks]
+    assert list(parallel.imap(_scale, tasks, workers=1, context=3)) == expected
+    # more tasks than one window
+    assert list(parallel.imap(_scale, iter(tasks), workers=2, chunksize=4,
+                              context=3)) == expected
+    assert sorted(parallel.imap(_scale, tasks, workers=2, context=3,
+                                ordered=False)) == expected
+
+
+def test_imap_merges_reports():
+    for workers in (1, 2):
+        report = ScanReport()
+        results = list(parallel.imap(_scale_and_report, range(100), workers, chunksize=3,
+                                     context=2, report=report))
+        assert results == [task * 2 for task in range(100)]
+        assert report.counts == {"missing file": 10}
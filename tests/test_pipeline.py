@@ -0,0 +1,41 @@
+from collections import Counter
+
+from pycproject.pipeline import Pipeline
+from pycproject.readctree import CProject
+
+
+def is_binomial(result):
+    return result["type"] == "binomial"
+
+
+def exact(result):
+    return result["exact"]
+
+
+def id_and_plugins(ctree):
+    return [ctree.ID, ctree.available_plugins]
+
+
+def test_results_serial_and_parallel(cproject_folder):
+    cproject = CProject(*cproject_folder)
+    pipeline = Pipeline.results(cproject).filter(is_binomial).map(exact)
+    expected = Counter({"Homo sapiens": 5, "Mus musculus": 5})
+    assert pipeline.to_counter() == expected
+    assert pipeline.parallel(workers=2, chunksize=1).to_counter() == expected
+    assert cproject.report.counts["no results"] == 1
+
+
+def test_batches(cproject_folder):
+    cproject = CProject(*cproject_folder)
+    batches = Pipeline.results(cproject).map(exact).batch(4).to_list()
+    assert [len(batch) for batch in batches] == [4, 4, 2]
+    assert Pipeline.results(cproject).map(exact).batch(4).to_counter()["Homo sapiens"] == 5
+    assert Pipeline.ctrees(cproject).batch(4).map(len).to_list() == [4, 2]
+
+
+def test_list_items_are_not_flattened(cproject_folder, tmp_path):
+    cproject = CProject(*cproject_folder)
+    pipeline = Pipeline.ctrees(cproject).map(id_and_plugins)
+    assert len(pipeline.to_list()) == 6
+    assert pipeline.parallel(2).to_list() == pipeline.to_list()
+    assert pipeline.to_ndjson(str(tmp_path / "out.ndjson")) == 6
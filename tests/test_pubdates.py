@@ -0,0 +1,71 @@
+import os
+import json
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from pycproject.readctree import CProject
+
+
+@pytest.fixture
+def cproject(cproject_folder):
+    """
+    Publication dates 2010-01-10, 2011-02-11, 2012-03-12,
+    2010-04-13, 2011-05-14 and 2012-06-15, PMC105 has no results.
+    """
+    return CProject(*cproject_folder)
+
+
+def test_pub_dates(cproject_folder):
+    projectpath, projectname = cproject_folder
+    projectfolder = os.path.join(projectpath, projectname)
+    with open(os.path.join(projectfolder, "PMC100", "eupmc_result.json"), "w") as outfile:
+        json.dump({"firstPublicationDate": "2010-13-45"}, outfile)
+    os.remove(os.path.join(projectfolder, "PMC101", "eupmc_result.json"))
+    cproject = CProject(projectpath, projectname)
+    ctreeIDs, dates = cproject.get_pub_dates()
+    dates = dict(zip(ctreeIDs, dates))
+    assert np.isnat(dates["PMC100"]) and np.isnat(dates["PMC101"])
+    assert dates["PMC102"] == np.datetime64("2012-03-12")
+    assert cproject.report.counts == {"no metadata": 1}
+    assert cproject.get_pub_histogram().sum() == 4
+
+
+def test_histogram_by_year(cproject):
+    histogram = cproject.get_pub_histogram()
+    assert list(histogram.index.year) == [2010, 2011, 2012]
+    assert list(histogram) == [2, 2, 2]
+    assert list(cproject.get_pub_years()) == [2, 2, 2]
+    assert list(cproject.get_pub_years(min_year=2008).index) == [2008, 2009, 2010, 2011, 2012]
+
+
+def test_histogram_by_month_and_week(cproject):
+    months = cproject.get_pub_histogram("M")
+    assert len(months) == 30
+    assert months.sum() == 6
+    assert months[pd.Timestamp("2011-02-01")] == 1
+    weeks = cproject.get_pub_histogram("W")
+    assert weeks.sum() == 6
+    # weeks start on monday, 2010-01-10 is a sunday
+    assert weeks.index[0] == pd.Timestamp("2010-01-04")
+    assert set(weeks.index.dayofweek) == {0}
+    with pytest.raises(ValueError):
+        cproject.get_pub_histogram("D")
+
+
+def test_histogram_by_results(cproject_folder):
+    projectpath, projectname = cproject_folder
+    projectfolder = os.path.join(projectpath, projectname)
+    # stray files and empty query folders are not counted
+    with open(os.path.join(projectfolder, "PMC100", "results", ".DS_Store"), "w"):
+        pass
+    os.makedirs(os.path.join(projectfolder, "PMC100", "results", "gene", "human"))
+    cproject = CProject(projectpath, projectname)
+    by_query = cproject.get_pub_histogram(by="query")
+    assert list(by_query.columns) == ["species/binomial"]
+    assert list(by_query["species/binomial"]) == [2, 2, 1]
+    assert by_query.equals(cproject.get_pub_histogram(by="plugin").rename(
+        columns={"species": "species/binomial"}))
+    with pytest.raises(ValueError):
+        cproject.get_pub_histogram(by="journal")
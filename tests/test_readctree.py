@@ -0,0 +1,69 @@
+import os
+
+from pycproject.readctree import CProject
+
+
+def test_read_resultsxml(cproject_folder):
+    cproject = CProject(*cproject_folder)
+    ctree = cproject.get_ctree("PMC100")
+    results = ctree.read_resultsxml(os.path.join(ctree.resultspath, "species", "binomial",
+                                                 "results.xml"))
+    assert [result["exact"] for result in results] == ["Homo sapiens", "Mus musculus"]
+    assert ctree.read_resultsxml(os.path.join(ctree.resultspath, "gene", "human",
+                                              "results.xml")) == []
+    assert ctree.report.counts["no results.xml"] == 1
+
+
+def test_read_resultsxml_outside_ctree(cproject_folder):
+    cproject = CProject(*cproject_folder)
+    other = cproject.get_ctree("PMC101")
+    ctree = cproject.get_ctree("PMC100")
+    results = ctree.read_resultsxml(os.path.join(other.resultspath, "species", "binomial",
+                                                 "results.xml"))
+    assert len(results) == 2
+    assert ctree.read_resultsxml(os.path.join(other.resultspath, "gene",
+                                              "results.xml")) == []
+    assert len(ctree.report) == 1
+
+
+def test_report_per_scan(cproject_folder):
+    cproject = CProject(*cproject_folder)
+    for _ in range(2):
+        results = list(cproject.get_results())
+        assert len(results) == 10
+        # PMC105 has no results folder
+        assert cproject.report.counts["no results"] == 1
+    first = cproject.report
+    list(cproject.extract_text(["abstract"], workers=1))
+    assert cproject.report is not first
+    assert len(cproject.report) == 0
+    assert first.counts["no results"] == 1
+
+
+def test_ctree_report(cproject_folder):
+    cproject = CProject(*cproject_folder)
+    ctree = cproject.get_ctree("PMC105")
+    assert ctree.results == {}
+    assert ctree.entities == {}
+    assert ctree.report.counts == {"no results": 1, "no entities": 1}
+    # read outside of a scan
+    assert len(cproject.report) == 0
+
+
+def test_front_parsed_once(cproject_folder, monkeypatch):
+    from pycproject import jats
+    calls = []
+    parse_front = jats.parse_front
+    monkeypatch.setattr(jats, "parse_front",
+                        lambda source: calls.append(source) or parse_front(source))
+    ctree = CProject(*cproject_folder).get_ctree("PMC100")
+    assert ctree.get_keywords() == ["mice", "genes"]
+    assert ctree.get_journal() == "PLoS One"
+    assert ctree.get_institutions() == ["University of Vienna"]
+    assert len(calls) == 1
+    assert ctree.get_references() == ["A ref title 2001"]
+    # without <front>, the whole fulltext.xml is parsed and kept instead
+    ctree = CProject(*cproject_folder).get_ctree("PMC101")
+    assert ctree.get_keywords() == ["orphan"]
+    assert ctree.get_journal() is None
+    assert len(calls) == 2
@@ -0,0 +1,63 @@
+import os
+import shutil
+
+import pytest
+from lxml import html
+
+from pycproject import textextract
+from pycproject.readctree import CProject
+from pycproject.search import CProjectIndex
+
+
+@pytest.fixture
+def index(cproject_folder, tmp_path):
+    projectpath, projectname = cproject_folder
+    with open(os.path.join(projectpath, projectname, "PMC102", "scholarly.html"), "w") as outfile:
+        outfile.write("<html><body><h2>Methods</h2><p>Cells with COVID-19 "
+                      "from the patient's lungs.</p></body></html>")
+    index = CProjectIndex(CProject(projectpath, projectname), str(tmp_path / "index.sqlite"))
+    index.build(workers=1)
+    yield index
+    index.close()
+
+
+def test_split_sections_stops_at_next_heading():
+    root = html.fromstring("<html><head><title>T</title></head><body>"
+                           "<div tag='abstract'><p>Short.</p></div>"
+                           "<div><h2>Methods</h2><p>one</p><p>two</p>"
+                           "<h2>Results</h2><p>three</p></div></body></html>")
+    assert textextract.split_sections(root) == [("title", "T"), ("abstract", "Short."),
+                                                ("Methods", "one two"), ("Results", "three")]
+
+
+def test_build(index):
+    assert len(index) == 6
+    # nothing changed
+    assert index.build(workers=1) == 0
+
+
+def test_search_terms(index):
+    assert index.search_ids("Escherichia coli") == {"PMC100", "PMC101", "PMC103",
+                                                   "PMC104", "PMC105"}
+    assert index.search_ids("COVID-19") == {"PMC102"}
+    assert index.search_ids("patient's") == {"PMC102"}
+    assert index.search_ids('"quoted') == set()
+    assert index.search_ids("coli", section="Methods") == index.search_ids("coli")
+    assert index.search_ids("coli", section="Results") == set()
+
+
+def test_search_phrase_and_raw(index):
+    assert index.search_ids("coli Escherichia", phrase=True) == set()
+    assert index.search_ids("Escherichia coli", phrase=True) == index.search_ids("coli")
+    assert index.search_ids("COVID OR Escherichia", raw=True) == set(
+        "PMC10%d" % i for i in range(6))
+    with pytest.raises(ValueError):
+        index.search("COVID-19", raw=True)
+
+
+def test_build_removes_deleted_ctrees(index):
+    shutil.rmtree(os.path.join(index.cproject.projectfolder, "PMC100"))
+    os.remove(os.path.join(index.cproject.projectfolder, "PMC101", "scholarly.html"))
+    index.build(workers=1)
+    assert len(index) == 4
+    assert index.search_ids("coli") == {"PMC103", "PMC104", "PMC105"}
@@ -0,0 +1,81 @@
+import os
+
+import pytest
+
+from pycproject import storage
+from pycproject.readctree import CProject
+
+
+@pytest.fixture
+def packed(cproject_folder):
+    """
+    Returns the CProject read from its folder and from a packed archive.
+    """
+    projectpath, projectname = cproject_folder
+    storage.pack(os.path.join(projectpath, projectname),
+                 os.path.join(projectpath, "project.cpack"))
+    return CProject(projectpath, projectname), CProject(projectpath, "project.cpack")
+
+
+def _accessors(ctree):
+    return {"metadata": ctree.metadata,
+            "entities": ctree.entities,
+            "available_plugins": ctree.available_plugins,
+            "plugin_queries": ctree.plugin_queries,
+            "results": ctree.results,
+            "title": ctree.get_title(),
+            "keywords": ctree.get_keywords(),
+            "journal": ctree.get_journal(),
+            "institutions": ctree.get_institutions(),
+            "references": ctree.get_references(),
+            "fulltext_fields": ctree.get_fulltext_fields("keywords", "references"),
+            "authors": ctree.get_authors(),
+            "abstract": ctree.get_abstract(),
+            "acknowledgements": ctree.get_acknowledgements(),
+            "competing_interests": ctree.get_competing_interests(),
+            "section": ctree.get_section("Methods"),
+            "extract_text": ctree.extract_text("abstract", "Methods",
+                                               "competing_interests")}
+
+
+def test_is_archive(packed, cproject_folder):
+    projectpath, projectname = cproject_folder
+    assert storage.is_archive(os.path.join(projectpath, "project.cpack"))
+    assert not storage.is_archive(os.path.join(projectpath, projectname))
+    assert not storage.is_archive(os.path.join(projectpath, projectname, "PMC100",
+                                               "fulltext.xml"))
+
+
+def test_archive_matches_folder(packed):
+    folder, archive = packed
+    assert sorted(folder.get_ctree_ids()) == sorted(archive.get_ctree_ids())
+    for ctreeID in folder.get_ctree_ids():
+        assert _accessors(folder.get_ctree(ctreeID)) == _accessors(archive.get_ctree(ctreeID))
+
+
+def test_front_matter_without_front(packed):
+    for cproject in packed:
+        ctree = cproject.get_ctree("PMC101")
+        assert ctree.get_keywords() == ["orphan"]
+        assert ctree.get_journal() is None
+        assert ctree.get_institutions() == []
+
+
+def test_archive_results_and_histogram(packed):
+    folder, archive = packed
+    assert (sorted(map(sorted, (r.items() for r in folder.get_results()))) ==
+            sorted(map(sorted, (r.items() for r in archive.get_results()))))
+    assert folder.get_pub_histogram(by="query").equals(archive.get_pub_histogram(by="query"))
+
+
+def test_store_listdir_and_exists(packed):
+    folder, archive = packed
+    for cproject in packed:
+        store = cproject.get_store("PMC100")
+        assert store.listdir("results") == ["species"]
+        assert store.exists("results/species/binomial/results.xml")
+        assert not store.exists("results/gene")
+        with pytest.raises(FileNotFoundError):
+            store.read("missing.json")
+    assert (folder.get_store("PMC100").manifest() ==
+            archive.get_store("PMC100").manifest())
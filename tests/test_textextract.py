@@ -0,0 +1,76 @@
+import os
+import json
+
+import pytest
+from lxml import html
+
+from pycproject import textextract
+from pycproject.readctree import CProject
+
+
+FIELDS = ["abstract", "acknowledgements", "competing_interests", "Methods"]
+
+
+def test_extract_sections():
+    root = html.fromstring("<html><body><div tag='abstract'><p>One.</p><p>Two.</p></div>"
+                           "<div><h2>Methods</h2><p>a</p><p>b <i>c</i></p></div>"
+                           "<div><h2>Acknowledgements</h2><p>Thanks.</p></div>"
+                           "<p><b>Competing interests</b></p><p>None.</p></body></html>")
+    assert textextract.extract_sections(root, FIELDS + ["Discussion"]) == {
+        "abstract": "One. Two.", "acknowledgements": "Thanks.",
+        "competing_interests": "None.", "Methods": "a b c", "Discussion": ""}
+
+
+def test_extract_text_matches_ctree_methods(cproject_folder):
+    cproject = CProject(*cproject_folder)
+    rows = list(cproject.extract_text(FIELDS, workers=1))
+    assert [row["ID"] for row in rows] == cproject.get_ctree_ids()
+    for row in rows:
+        ctree = cproject.get_ctree(row["ID"])
+        assert row["abstract"] == ctree.get_abstract()
+        assert row["acknowledgements"] == ctree.get_acknowledgements()
+        assert row["competing_interests"] == ctree.get_competing_interests()
+        assert row["Methods"] == ctree.get_section("Methods")
+        assert row == dict(ctree.extract_text(*FIELDS), ID=ctree.ID)
+    assert list(cproject.extract_text(FIELDS, workers=2)) == rows
+
+
+def test_empty_broken_and_missing_files(cproject_folder):
+    projectpath, projectname = cproject_folder
+    projectfolder = os.path.join(projectpath, projectname)
+    with open(os.path.join(projectfolder, "PMC100", "scholarly.html"), "w"):
+        pass
+    os.remove(os.path.join(projectfolder, "PMC101", "scholarly.html"))
+    cproject = CProject(projectpath, projectname)
+    rows = {row["ID"]: row for row in cproject.extract_text(FIELDS, workers=1)}
+    empty = {field: "" for field in FIELDS}
+    assert rows["PMC100"] == dict(empty, ID="PMC100")
+    assert rows["PMC101"] == dict(empty, ID="PMC101")
+    assert rows["PMC102"]["Methods"].startswith("Samples of Escherichia coli were used.")
+    assert cproject.report.counts == {"xml error": 1}
+    assert cproject.get_ctree("PMC100").extract_text("abstract") == {"abstract": ""}
+
+
+def test_utf8_without_meta_charset(tmp_path):
+    path = str(tmp_path / "scholarly.html")
+    with open(path, "w", encoding="utf-8") as outfile:
+        outfile.write("<html><body><h2>Methods</h2><p>Müller, 10 µm</p></body></html>")
+    assert textextract.extract_file(path, ["Methods"]) == {"Methods": "Müller, 10 µm"}
+
+
+def test_write_jsonl(cproject_folder, tmp_path):
+    cproject = CProject(*cproject_folder)
+    output = str(tmp_path / "sections.jsonl")
+    cproject.extract_text(["abstract"], workers=1, output=output)
+    with open(output) as infile:
+        rows = [json.loads(line) for line in infile]
+    assert len(rows) == 6
+    assert rows[0]["abstract"].startswith("We study Homo sapiens")
+
+
+def test_write_parquet(cproject_folder, tmp_path):
+    pq = pytest.importorskip("pyarrow.parquet")
+    cproject = CProject(*cproject_folder)
+    output = str(tmp_path / "sections.parquet")
+    cproject.extract_text(["abstract"], workers=1, output=output)
+    assert pq.read_table(output).num_rows == 6